@@ -3,4 +3,27 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from django.conf import settings  # noqa: E402  (après django.setup())
+
+LIVE_PREFIX = '/api/live/'
+
+
+async def application(scope, receive, send):
+    """Sert le flux /api/live/ ; l'API REST reste sous WSGI (gunicorn, threads).
+
+    Sous ASGI, les vues synchrones de DRF partagent un seul thread et les
+    réponses en flux synchrones (exports, rapports) sont mises en mémoire avant
+    envoi : ce serveur ne répond donc qu'au flux temps réel, sauf si
+    ``LIVE_ASGI_ONLY=0`` (développement : un seul processus pour tout).
+    """
+    if scope['type'] == 'http' and settings.LIVE_ASGI_ONLY and not scope['path'].startswith(LIVE_PREFIX):
+        await send({
+            'type': 'http.response.start',
+            'status': 404,
+            'headers': [(b'content-type', b'application/json')],
+        })
+        await send({'type': 'http.response.body', 'body': b'{"detail": "Seul /api/live/ est servi en ASGI."}'})
+        return
+    await django_application(scope, receive, send)
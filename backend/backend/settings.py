@@ -100,6 +100,8 @@ STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'static'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# Archives d'export des données personnelles : hors de MEDIA_ROOT, jamais servies directement
+EXPORT_ROOT = Path(os.getenv('EXPORT_ROOT', BASE_DIR / 'private'))
 
 CORS_ALLOW_ALL_ORIGINS = True
 
@@ -112,6 +114,66 @@ REST_FRAMEWORK = {
 	),
 }
 
+# Longueur de clé de rang (kanban) au-delà de laquelle la colonne est rééquilibrée
+TASK_RANK_MAX_LENGTH = int(os.getenv('TASK_RANK_MAX_LENGTH', '12'))
+
+# Pagination par curseur des collections de l'app work
+API_PAGE_SIZE = int(os.getenv('API_PAGE_SIZE', '100'))
+API_MAX_PAGE_SIZE = int(os.getenv('API_MAX_PAGE_SIZE', '500'))
+
+# Exports asynchrones : exécutés dans un thread du processus web, sinon par `manage.py run_export_jobs`
+EXPORT_JOBS_IN_PROCESS = os.getenv('EXPORT_JOBS_IN_PROCESS', '1') == '1'
+# Un job « en cours » depuis plus longtemps est considéré interrompu ; archives conservées N jours
+EXPORT_JOB_TIMEOUT = int(os.getenv('EXPORT_JOB_TIMEOUT', '3600'))
+EXPORT_RETENTION_DAYS = int(os.getenv('EXPORT_RETENTION_DAYS', '7'))
+
+# Cache partagé (Redis) si REDIS_URL est défini, sinon mémoire locale du processus :
+# les versions de cache incrémentées par les signaux doivent être vues de tous les workers
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+	CACHES = {
+		'default': {
+			'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+			'LOCATION': REDIS_URL,
+		}
+	}
+else:
+	CACHES = {
+		'default': {
+			'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+		}
+	}
+
+# Événements récurrents : cache des occurrences déroulées par fenêtre, borne par événement
+EVENT_OCCURRENCE_CACHE_TIMEOUT = int(os.getenv('EVENT_OCCURRENCE_CACHE_TIMEOUT', '3600'))
+EVENT_MAX_OCCURRENCES = int(os.getenv('EVENT_MAX_OCCURRENCES', '1000'))
+EVENT_MAX_WINDOW_DAYS = int(os.getenv('EVENT_MAX_WINDOW_DAYS', '400'))
+# Itérations de règle au plus par déroulement (occurrences antérieures à la fenêtre comprises)
+EVENT_MAX_ITERATIONS = int(os.getenv('EVENT_MAX_ITERATIONS', '20000'))
+# Créneaux matérialisés des Schedule, par semaine (invalidés à chaque modification)
+SCHEDULE_WEEK_CACHE_TIMEOUT = int(os.getenv('SCHEDULE_WEEK_CACHE_TIMEOUT', str(7 * 24 * 3600)))
+
+# Cache des réponses par utilisateur (work.response_cache), invalidé par versions
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', '600'))
+
+# Statistiques d'avancement des projets (work.project_stats), invalidées par Project.updated_at ; 0 désactive le cache
+PROJECT_STATS_CACHE_TIMEOUT = int(os.getenv('PROJECT_STATS_CACHE_TIMEOUT', '3600'))
+
+# Synchronisation incrémentale (/api/sync/) : recouvrement du curseur, durée de conservation des suppressions
+SYNC_CURSOR_OVERLAP = int(os.getenv('SYNC_CURSOR_OVERLAP', '30'))
+SYNC_TOMBSTONE_RETENTION_DAYS = int(os.getenv('SYNC_TOMBSTONE_RETENTION_DAYS', '30'))
+SYNC_PAGE_SIZE = int(os.getenv('SYNC_PAGE_SIZE', '500'))
+
+# Mises à jour en temps réel (/api/live/, SSE sous ASGI) : pub/sub Redis si disponible, sinon en mémoire.
+# Le serveur ASGI ne sert que /api/live/ (l'API reste sous gunicorn) ; il publie et lit alors dans deux
+# processus distincts, d'où Redis en production. LIVE_ASGI_ONLY=0 : tout servir en ASGI (développement).
+LIVE_UPDATES_BACKEND = os.getenv(
+	'LIVE_UPDATES_BACKEND', 'work.live.RedisBackend' if REDIS_URL else 'work.live.InProcessBackend'
+)
+LIVE_HEARTBEAT = int(os.getenv('LIVE_HEARTBEAT', '15'))
+LIVE_QUEUE_SIZE = int(os.getenv('LIVE_QUEUE_SIZE', '100'))
+LIVE_ASGI_ONLY = os.getenv('LIVE_ASGI_ONLY', '1') == '1'
+
 SIMPLE_JWT = {
 	'ACCESS_TOKEN_LIFETIME': timedelta(hours=8),
 	'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
@@ -0,0 +1,56 @@
+CHUNK_SIZE = 2000
+
+
+def user_profile(user):
+    return {
+        'personal_identifier': user.personal_identifier,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'email': user.email,
+        'date_joined': user.date_joined,
+        'notification_preferences': user.notification_preferences,
+        'appearance_preferences': user.appearance_preferences,
+    }
+
+
+def user_export_sections(user):
+    """Sections (clé, lignes) de l'export d'un utilisateur.
+
+    Chaque section est un itérateur paresseux (curseur côté serveur sous
+    PostgreSQL) : rien n'est chargé tant que l'export n'est pas consommé.
+    """
+    from work.models import Project, Task, Event, EventException, TimeEntry, Comment, Doc, Schedule
+
+    querysets = {
+        'projects': Project.objects.filter(tasks__assignee=user).distinct().order_by('id').values(
+            'id', 'name', 'description', 'client', 'deadline', 'status', 'category',
+            'created_at', 'updated_at'
+        ),
+        'tasks': Task.objects.filter(assignee=user).order_by('id').values(
+            'id', 'title', 'description', 'status', 'priority', 'project_id',
+            'due_date', 'tags', 'created_at', 'updated_at'
+        ),
+        'events': Event.objects.filter(user=user).order_by('id').values(
+            'id', 'title', 'description', 'event_type', 'start_datetime', 'end_datetime',
+            'all_day', 'location', 'project_id', 'task_id', 'color', 'is_recurring',
+            'recurrence_rule', 'created_at', 'updated_at'
+        ),
+        'event_exceptions': EventException.objects.filter(event__user=user).order_by('id').values(
+            'id', 'event_id', 'occurrence_start', 'is_cancelled', 'start_datetime', 'end_datetime',
+            'title', 'created_at'
+        ),
+        'schedules': Schedule.objects.filter(user=user).order_by('id').values(
+            'id', 'name', 'day_of_week', 'start_time', 'end_time', 'title', 'description',
+            'event_type', 'color', 'is_active', 'created_at'
+        ),
+        'time_entries': TimeEntry.objects.filter(user=user).order_by('id').values(
+            'id', 'task_id', 'started_at', 'ended_at', 'duration_minutes', 'description', 'created_at'
+        ),
+        'comments': Comment.objects.filter(author=user).order_by('id').values(
+            'id', 'task_id', 'content', 'created_at'
+        ),
+        'docs': Doc.objects.filter(author=user).order_by('id').values(
+            'id', 'title', 'content', 'category', 'created_at', 'updated_at'
+        ),
+    }
+    return [(key, qs.iterator(chunk_size=CHUNK_SIZE)) for key, qs in querysets.items()]
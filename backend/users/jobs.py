@@ -0,0 +1,160 @@
+import logging
+import os
+import secrets
+import shutil
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .exports import user_export_sections, user_profile
+from .models import ExportJob, export_storage
+
+logger = logging.getLogger(__name__)
+
+# Un seul thread : les exports sont sérialisés et n'accaparent pas le processus web
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='export-jobs')
+
+
+def enqueue_export(user):
+    """Crée un job d'export et le planifie dans le processus courant si activé.
+
+    Sinon (EXPORT_JOBS_IN_PROCESS=0), le job attend la commande ``run_export_jobs``.
+    """
+    fail_stale()
+    job = ExportJob.objects.create(user=user)
+    if settings.EXPORT_JOBS_IN_PROCESS:
+        transaction.on_commit(lambda: _executor.submit(_run_in_thread, job.pk))
+        # Sans worker séparé, le ménage des archives expirées se fait ici, en arrière-plan
+        transaction.on_commit(lambda: _executor.submit(_in_thread, cleanup_expired))
+    return job
+
+
+def _run_in_thread(job_id):
+    _in_thread(run_export_job, job_id)
+
+
+def _in_thread(function, *args):
+    close_old_connections()
+    try:
+        function(*args)
+    finally:
+        close_old_connections()
+
+
+def claim(job_id):
+    """Passe le job en ``running`` si personne ne l'a déjà pris (UPDATE conditionnel)"""
+    return ExportJob.objects.filter(pk=job_id, status='pending').update(
+        status='running', started_at=timezone.now()
+    ) == 1
+
+
+def fail_stale():
+    """Passe en échec les jobs ``running`` depuis plus de ``EXPORT_JOB_TIMEOUT`` secondes.
+
+    Un processus arrêté en cours d'export (redéploiement, OOM) laisse son job
+    ``running`` : sans cela l'utilisateur attendrait indéfiniment. Le job
+    n'est pas relancé (il pourrait à nouveau faire tomber le worker) ;
+    l'utilisateur peut demander un nouvel export.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.EXPORT_JOB_TIMEOUT)
+    stale = list(ExportJob.objects.filter(status='running', started_at__lt=cutoff).values_list('pk', 'file'))
+    _delete_files([name for _, name in stale if name], export_storage())
+    return ExportJob.objects.filter(pk__in=[pk for pk, _ in stale], status='running').update(
+        status='failed', file='', error="Export interrompu (délai dépassé).", finished_at=timezone.now()
+    )
+
+
+def cleanup_expired():
+    """Supprime les jobs terminés depuis plus de ``EXPORT_RETENTION_DAYS`` jours et leurs archives,
+    ainsi que les fichiers de EXPORT_ROOT/exports/ aussi anciens qu'aucun job ne référence"""
+    cutoff = timezone.now() - timedelta(days=settings.EXPORT_RETENTION_DAYS)
+    expired = ExportJob.objects.filter(status__in=['done', 'failed'], finished_at__lt=cutoff)
+    names = [name for name in expired.values_list('file', flat=True) if name]
+    _delete_files(names, export_storage())
+    deleted = expired.delete()[0]
+
+    directory = Path(settings.EXPORT_ROOT) / 'exports'
+    if directory.is_dir():
+        referenced = {os.path.basename(name) for name in ExportJob.objects.exclude(file='').values_list('file', flat=True)}
+        for path in directory.iterdir():
+            if path.is_file() and path.name not in referenced and path.stat().st_mtime < cutoff.timestamp():
+                # Archive orpheline (job purgé, export interrompu) ; celles en cours d'écriture sont récentes
+                path.unlink(missing_ok=True)
+    return deleted
+
+
+def archive_name(job):
+    """Nom de stockage imprévisible (le nom de téléchargement est fixé par la vue ``download``)"""
+    return f'exports/{job.pk}_{secrets.token_urlsafe(16)}.zip'
+
+
+def run_export_job(job_id):
+    """Écrit l'archive zip (data.json + pièces jointes) d'un job en attente"""
+    if not claim(job_id):
+        return
+    job = ExportJob.objects.select_related('user').get(pk=job_id)
+    name = archive_name(job)
+    # Nom enregistré dès le départ : fail_stale() retrouve l'archive d'un export interrompu
+    ExportJob.objects.filter(pk=job_id).update(file=name)
+    path = Path(export_storage().path(name))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        write_archive(job.user, path)
+    except Exception as exc:
+        logger.exception("Export %s en échec", job_id)
+        path.unlink(missing_ok=True)
+        ExportJob.objects.filter(pk=job_id).update(status='failed', file='', error=str(exc), finished_at=timezone.now())
+        return
+    ExportJob.objects.filter(pk=job_id).update(
+        status='done', file=name, size=os.path.getsize(path), finished_at=timezone.now()
+    )
+
+
+def write_archive(user, path):
+    from work.models import Attachment
+    from work.streaming import json_object
+
+    with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        with archive.open('data.json', 'w') as data:
+            for chunk in json_object({'user_profile': user_profile(user)}, user_export_sections(user)):
+                data.write(chunk.encode())
+        attachments = Attachment.objects.filter(task__assignee=user).only('id', 'file').order_by('id')
+        for attachment in attachments.iterator(chunk_size=500):
+            if not attachment.file or not attachment.file.storage.exists(attachment.file.name):
+                continue
+            arcname = f'attachments/{attachment.pk}_{os.path.basename(attachment.file.name)}'
+            with attachment.file.open('rb') as source, archive.open(arcname, 'w', force_zip64=True) as target:
+                shutil.copyfileobj(source, target)
+
+
+def delete_files(names, storage=None):
+    """Efface des fichiers du stockage (par défaut : MEDIA_ROOT) en arrière-plan (après une purge)"""
+    return _executor.submit(_delete_files, list(names), storage)
+
+
+def _delete_files(names, storage=None):
+    storage = storage or default_storage
+    for name in names:
+        try:
+            storage.delete(name)
+        except OSError:
+            logger.warning("Impossible de supprimer %s", name, exc_info=True)
+
+
+def run_pending(limit=None):
+    """Traite les jobs en attente, du plus ancien au plus récent ; renvoie le nombre traité"""
+    fail_stale()
+    pending = ExportJob.objects.filter(status='pending').order_by('created_at').values_list('pk', flat=True)
+    if limit:
+        pending = pending[:limit]
+    processed = 0
+    for job_id in list(pending):
+        run_export_job(job_id)
+        processed += 1
+    return processed
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+from users.jobs import cleanup_expired, run_pending
+
+# Le ménage des archives expirées n'a pas besoin d'être fait à chaque interrogation
+CLEANUP_INTERVAL = 3600
+
+
+class Command(BaseCommand):
+    help = "Traite les exports de données en attente (worker sans broker externe) et supprime les archives expirées"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help="Continuer à interroger la table des jobs")
+        parser.add_argument('--interval', type=float, default=5.0, help="Secondes entre deux interrogations")
+
+    def handle(self, *args, **options):
+        last_cleanup = None
+        while True:
+            if last_cleanup is None or time.monotonic() - last_cleanup >= CLEANUP_INTERVAL:
+                deleted = cleanup_expired()
+                if deleted:
+                    self.stdout.write(f'{deleted} export(s) expiré(s) supprimé(s)')
+                last_cleanup = time.monotonic()
+            processed = run_pending()
+            if processed:
+                self.stdout.write(self.style.SUCCESS(f'{processed} export(s) traité(s)'))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
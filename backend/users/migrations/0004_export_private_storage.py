@@ -0,0 +1,35 @@
+# Generated by Django 5.0.6 on 2026-10-18 12:46
+
+import shutil
+from pathlib import Path
+
+import users.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+def move_archives(apps, schema_editor):
+    """Déplace les archives existantes de MEDIA_ROOT (servi publiquement) vers EXPORT_ROOT"""
+    ExportJob = apps.get_model('users', 'ExportJob')
+    for name in ExportJob.objects.exclude(file='').values_list('file', flat=True):
+        source = Path(settings.MEDIA_ROOT) / name
+        if source.is_file():
+            target = Path(settings.EXPORT_ROOT) / name
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(source, target)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_export_job'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='exportjob',
+            name='file',
+            field=models.FileField(blank=True, storage=users.models.export_storage, upload_to='exports/'),
+        ),
+        migrations.RunPython(move_archives, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,91 @@
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .jobs import delete_files
+from .models import ExportJob, export_storage
+
+
+def _bulk_delete(queryset):
+    """DELETE ensembliste sans passer par le Collector (ni chargement des lignes, ni signaux).
+
+    Réservé aux suppressions dont les dépendances ont déjà été supprimées
+    et dont les données dérivées sont purgées dans la même transaction.
+    """
+    return queryset._raw_delete(queryset.db)
+
+
+def purge_user_data(user):
+    """Supprime en une transaction les données d'un utilisateur, dans l'ordre des dépendances.
+
+    Les tâches assignées sont supprimées avec tout ce qui en dépend (y compris
+    le temps saisi par d'autres sur ces tâches, comme le ferait la cascade).
+    Les fichiers (pièces jointes, archives d'export) sont effacés après commit,
+    en arrière-plan. Renvoie le nombre de lignes supprimées par type.
+    """
+    from work import project_stats, response_cache, sync
+    from work.models import (
+        Task, SubTask, Comment, Attachment, TimeEntry, Timer, Event, Schedule, Doc, DailyTimeRollup,
+        SearchEntry, TaskTag, EventException,
+    )
+
+    tasks = Task.objects.filter(assignee=user)
+    task_ids = tasks.values('pk')
+    comments = Comment.objects.filter(Q(author=user) | Q(task__in=task_ids))
+    docs = Doc.objects.filter(author=user)
+    counts = {}
+    with transaction.atomic():
+        # Réponses en cache d'autres utilisateurs touchés par la suppression des tâches
+        response_cache.bump(
+            *response_cache.user_scopes(Event.objects.filter(task__in=task_ids).values_list('user_id', flat=True), 'events'),
+            *response_cache.user_scopes(DailyTimeRollup.objects.filter(task__in=task_ids).values_list('user_id', flat=True), 'reports'),
+            *response_cache.user_scopes(Timer.objects.filter(task__in=task_ids).values_list('user_id', flat=True), 'timer'),
+        )
+        # Projets dont les tâches ou le temps saisi disparaissent : statistiques à recalculer
+        project_stats.invalidate(
+            Task.objects.filter(Q(assignee=user) | Q(time_entries__user=user)).values_list('project_id', flat=True).distinct()
+        )
+        # Données dérivées et dépendances des tâches, avant les tâches elles-mêmes
+        _bulk_delete(DailyTimeRollup.objects.filter(Q(user=user) | Q(task__in=task_ids)))
+        _bulk_delete(SearchEntry.objects.filter(
+            Q(user=user)
+            | Q(kind='task', object_id__in=task_ids)
+            | Q(kind='comment', object_id__in=comments.values('pk'))
+            | Q(kind='doc', object_id__in=docs.values('pk'))
+        ))
+        counts['time_entries'] = _bulk_delete(TimeEntry.objects.filter(Q(user=user) | Q(task__in=task_ids)))
+        counts['timers'] = _bulk_delete(Timer.objects.filter(Q(user=user) | Q(task__in=task_ids)))
+        # Tâches d'autres utilisateurs perdant un commentaire : à renvoyer à la synchronisation
+        sync.record_bulk(comments.exclude(task__in=task_ids))
+        counts['comments'] = _bulk_delete(comments)
+        counts['subtasks'] = _bulk_delete(SubTask.objects.filter(task__in=task_ids))
+        _bulk_delete(TaskTag.objects.filter(task__in=task_ids))
+        attachments = Attachment.objects.filter(task__in=task_ids)
+        files = [name for name in attachments.values_list('file', flat=True) if name]
+        counts['attachments'] = _bulk_delete(attachments)
+        _bulk_delete(EventException.objects.filter(event__user=user))
+        events = Event.objects.filter(user=user)
+        sync.record_bulk(events)
+        counts['events'] = _bulk_delete(events)
+        # Événements d'autres utilisateurs liés aux tâches supprimées : SET_NULL
+        Event.objects.filter(task__in=task_ids).update(task=None, updated_at=timezone.now())
+        sync.record_bulk(tasks)
+        counts['tasks'] = _bulk_delete(tasks)
+        counts['schedules'] = _bulk_delete(Schedule.objects.filter(user=user))
+        sync.record_bulk(docs)
+        counts['docs'] = _bulk_delete(docs)
+        exports = ExportJob.objects.filter(user=user)
+        archives = [name for name in exports.values_list('file', flat=True) if name]
+        counts['export_jobs'] = _bulk_delete(exports)
+
+        user.notification_preferences = {}
+        user.appearance_preferences = {}
+        user.save(update_fields=['notification_preferences', 'appearance_preferences'])
+
+        if files:
+            transaction.on_commit(lambda: delete_files(files))
+        if archives:
+            transaction.on_commit(lambda: delete_files(archives, export_storage()))
+        # Réponses et créneaux des Schedule en cache (work.response_cache, work.agenda)
+        response_cache.bump(*response_cache.user_scopes([user.pk], 'schedules', 'events', 'timer', 'reports'))
+    return counts
@@ -1,7 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
-from .models import User
+from .models import User, ExportJob
 
 
 class UserProfileSerializer(serializers.ModelSerializer):
@@ -59,3 +59,19 @@ class AppearancePreferencesSerializer(serializers.Serializer):
     accent_color = serializers.CharField(max_length=7, default='#8b5cf6')
     sidebar_collapsed = serializers.BooleanField(default=False)
     animations_enabled = serializers.BooleanField(default=True)
+
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ExportJob
+        fields = ['id', 'status', 'size', 'error', 'created_at', 'started_at', 'finished_at', 'download_url']
+        read_only_fields = fields
+
+    def get_download_url(self, obj):
+        if obj.status != 'done':
+            return None
+        url = f'/api/users/export-jobs/{obj.pk}/download/'
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
@@ -8,6 +8,9 @@ urlpatterns = [
     path('preferences/appearance/', views.appearance_preferences, name='appearance-preferences'),
     path('change-password/', views.change_password, name='change-password'),
     path('export-data/', views.export_user_data, name='export-user-data'),
+    path('export-jobs/', views.start_export_job, name='export-job-start'),
+    path('export-jobs/<int:pk>/', views.export_job_status, name='export-job-status'),
+    path('export-jobs/<int:pk>/download/', views.download_export, name='export-job-download'),
     path('delete-data/', views.delete_user_data, name='delete-user-data'),
     # Route d'initialisation (à utiliser une seule fois)
     path('init-admin/', init_admin, name='init-admin'),
@@ -1,18 +1,22 @@
 from rest_framework import generics, status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from django.http import HttpResponse
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
 from django.contrib.auth import get_user_model
-import json
-import csv
-from io import StringIO
-from .models import User
+from django.shortcuts import get_object_or_404
+import os
+import re
+from .exports import user_export_sections, user_profile
+from .jobs import enqueue_export
+from .purge import purge_user_data
+from .models import User, ExportJob
 from .serializers import (
     UserProfileSerializer, 
     UserPreferencesSerializer, 
     ChangePasswordSerializer,
     NotificationPreferencesSerializer,
-    AppearancePreferencesSerializer
+    AppearancePreferencesSerializer,
+    ExportJobSerializer
 )
 
 User = get_user_model()
@@ -103,52 +107,84 @@ def change_password(request):
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def export_user_data(request):
-    """Exporte toutes les données de l'utilisateur en JSON"""
+    """Exporte toutes les données de l'utilisateur en JSON, en flux"""
+    from work.streaming import json_object
+
     user = request.user
-    
-    # Récupérer toutes les données liées à l'utilisateur
-    from work.models import Project, Task, Event, TimeEntry, Comment, Attachment
-    
-    data = {
-        'user_profile': {
-            'personal_identifier': user.personal_identifier,
-            'first_name': user.first_name,
-            'last_name': user.last_name,
-            'email': user.email,
-            'date_joined': user.date_joined.isoformat(),
-            'notification_preferences': user.notification_preferences,
-            'appearance_preferences': user.appearance_preferences,
-        },
-        'projects': list(Project.objects.filter(created_by=user).values(
-            'id', 'name', 'description', 'status', 'priority', 'category',
-            'start_date', 'due_date', 'created_at'
-        )),
-        'tasks': list(Task.objects.filter(assigned_to=user).values(
-            'id', 'title', 'description', 'status', 'priority', 'project_id',
-            'due_date', 'created_at', 'updated_at'
-        )),
-        'events': list(Event.objects.filter(user=user).values(
-            'id', 'title', 'description', 'event_type', 'start_datetime',
-            'end_datetime', 'location', 'created_at'
-        )),
-        'time_entries': list(TimeEntry.objects.filter(user=user).values(
-            'id', 'task_id', 'start_time', 'end_time', 'duration', 'description'
-        )),
-        'comments': list(Comment.objects.filter(user=user).values(
-            'id', 'task_id', 'content', 'created_at'
-        )),
-    }
-    
-    # Convertir en JSON
-    json_data = json.dumps(data, indent=2, default=str)
-    
-    # Créer la réponse HTTP
-    response = HttpResponse(json_data, content_type='application/json')
+    head = {'user_profile': user_profile(user)}
+    response = StreamingHttpResponse(json_object(head, user_export_sections(user)), content_type='application/json')
     response['Content-Disposition'] = f'attachment; filename="workflow_data_{user.personal_identifier}.json"'
-    
     return response
 
 
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def start_export_job(request):
+    """Planifie un export asynchrone (archive zip avec pièces jointes)"""
+    job = enqueue_export(request.user)
+    return Response(ExportJobSerializer(job, context={'request': request}).data, status=status.HTTP_202_ACCEPTED)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def export_job_status(request, pk):
+    job = get_object_or_404(ExportJob, pk=pk, user=request.user)
+    return Response(ExportJobSerializer(job, context={'request': request}).data)
+
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def _ranged_file_response(request, path, filename, content_type):
+    """Réponse fichier gérant l'en-tête ``Range`` (un seul intervalle) pour les reprises"""
+    size = os.path.getsize(path)
+    match = RANGE_RE.match(request.META.get('HTTP_RANGE', '').strip())
+    first, last = match.groups() if match else ('', '')
+    if (first, last) == ('', '') or (first and last and int(last) < int(first)):
+        # Pas d'en-tête, ou intervalle syntaxiquement invalide : ignoré (RFC 7233), fichier complet
+        response = FileResponse(open(path, 'rb'), as_attachment=True, filename=filename, content_type=content_type)
+        response['Accept-Ranges'] = 'bytes'
+        return response
+
+    if first:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    else:
+        # Intervalle suffixe : les N derniers octets
+        start, end = max(0, size - int(last)), size - 1
+    if start > end or start >= size:
+        response = HttpResponse(status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    def chunks():
+        with open(path, 'rb') as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                data = f.read(min(64 * 1024, remaining))
+                if not data:
+                    break
+                remaining -= len(data)
+                yield data
+
+    response = StreamingHttpResponse(chunks(), status=status.HTTP_206_PARTIAL_CONTENT, content_type=content_type)
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = str(end - start + 1)
+    response['Accept-Ranges'] = 'bytes'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def download_export(request, pk):
+    job = get_object_or_404(ExportJob, pk=pk, user=request.user)
+    if job.status != 'done' or not job.file:
+        return Response({'error': "L'export n'est pas encore disponible."}, status=status.HTTP_409_CONFLICT)
+    filename = f'workflow_data_{request.user.personal_identifier}_{job.pk}.zip'
+    return _ranged_file_response(request, job.file.path, filename, 'application/zip')
+
+
 @api_view(['DELETE'])
 @permission_classes([permissions.IsAuthenticated])
 def delete_user_data(request):
@@ -163,30 +199,7 @@ def delete_user_data(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    # Supprimer toutes les données liées
-    from work.models import Project, Task, Event, TimeEntry, Comment, Attachment
-    
-    # Compter les éléments avant suppression
-    counts = {
-        'projects': Project.objects.filter(created_by=user).count(),
-        'tasks': Task.objects.filter(assigned_to=user).count(),
-        'events': Event.objects.filter(user=user).count(),
-        'time_entries': TimeEntry.objects.filter(user=user).count(),
-        'comments': Comment.objects.filter(user=user).count(),
-    }
-    
-    # Supprimer les données
-    Project.objects.filter(created_by=user).delete()
-    Task.objects.filter(assigned_to=user).delete()
-    Event.objects.filter(user=user).delete()
-    TimeEntry.objects.filter(user=user).delete()
-    Comment.objects.filter(user=user).delete()
-    Attachment.objects.filter(user=user).delete()
-    
-    # Réinitialiser les préférences utilisateur
-    user.notification_preferences = {}
-    user.appearance_preferences = {}
-    user.save()
+    counts = purge_user_data(user)
     
     return Response({
         'message': 'Toutes les données ont été supprimées avec succès.',
@@ -0,0 +1,100 @@
+"""Agenda d'un utilisateur : créneaux issus des ``Schedule`` fusionnés avec les événements.
+
+Les Schedule sont des modèles hebdomadaires ; leurs créneaux concrets sont
+calculés à la demande, semaine locale par semaine locale, et mis en cache
+sous la version ``schedules:<user>`` de work.response_cache. Toute
+modification d'un Schedule change cette version (signaux, purge) : les
+semaines déjà calculées ne sont plus lues et expirent d'elles-mêmes.
+"""
+import heapq
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from . import recurrence, response_cache
+
+WEEK_KEY = 'schedules:week:%s:%s:%s'
+
+
+def schedules_version(user_id):
+    return response_cache.version(f'schedules:{user_id}')
+
+
+def bump_schedules_version(user_id):
+    response_cache.bump(f'schedules:{user_id}')
+
+
+def _week_slots(schedules, monday):
+    """Créneaux (schedule_id, début, fin, titre, type, couleur) de la semaine commençant ``monday``"""
+    slots = []
+    for schedule in schedules:
+        day = monday + timedelta(days=schedule.day_of_week)
+        start = timezone.make_aware(datetime.combine(day, schedule.start_time))
+        end_day = day if schedule.end_time > schedule.start_time else day + timedelta(days=1)
+        end = timezone.make_aware(datetime.combine(end_day, schedule.end_time))
+        slots.append((schedule.pk, start.timestamp(), end.timestamp(),
+                      schedule.title, schedule.event_type, schedule.color))
+    return sorted(slots, key=lambda slot: (slot[1], slot[0]))
+
+
+def schedule_slots(user, window_start, window_end):
+    """Créneaux des Schedule actifs de ``user`` chevauchant [window_start, window_end), triés"""
+    from .models import Schedule
+
+    first = timezone.localtime(window_start).date()
+    last = timezone.localtime(window_end - timedelta(microseconds=1)).date()
+    # Un créneau de nuit déborde sur la semaine suivante : partir de la veille
+    monday = first - timedelta(days=1)
+    monday -= timedelta(days=monday.weekday())
+    weeks = []
+    while monday <= last:
+        weeks.append(monday)
+        monday += timedelta(days=7)
+
+    version = schedules_version(user.pk)
+    keys = {week: WEEK_KEY % (user.pk, version, week.isoformat()) for week in weeks}
+    cached = cache.get_many(keys.values())
+    missing = [week for week in weeks if keys[week] not in cached]
+    if missing:
+        schedules = list(Schedule.objects.filter(user=user, is_active=True))
+        computed = {keys[week]: _week_slots(schedules, week) for week in missing}
+        cache.set_many(computed, settings.SCHEDULE_WEEK_CACHE_TIMEOUT)
+        cached.update(computed)
+
+    tz = timezone.get_current_timezone()
+    start_ts, end_ts = window_start.timestamp(), window_end.timestamp()
+    slots = []
+    for week in weeks:
+        for schedule_id, start, end, title, event_type, color in cached[keys[week]]:
+            if start < end_ts and end > start_ts:
+                slots.append({
+                    'source': 'schedule', 'id': schedule_id, 'title': title,
+                    'start_datetime': datetime.fromtimestamp(start, tz=tz),
+                    'end_datetime': datetime.fromtimestamp(end, tz=tz),
+                    'all_day': False, 'event_type': event_type, 'color': color,
+                })
+    return slots
+
+
+def event_items(events, window_start, window_end):
+    tz = timezone.get_current_timezone()
+    return [
+        {
+            'source': 'event', 'id': occurrence.event.pk, 'title': occurrence.title,
+            'start_datetime': occurrence.start.astimezone(tz), 'end_datetime': occurrence.end.astimezone(tz),
+            'all_day': occurrence.event.all_day, 'event_type': occurrence.event.event_type,
+            'color': occurrence.event.color, 'occurrence_start': occurrence.occurrence_start.astimezone(tz),
+        }
+        for occurrence in recurrence.occurrences(events, window_start, window_end)
+    ]
+
+
+def agenda(user, events, window_start, window_end):
+    """Flux unique trié par début : occurrences d'événements et créneaux des Schedule"""
+    return list(heapq.merge(
+        event_items(events, window_start, window_end),
+        schedule_slots(user, window_start, window_end),
+        key=lambda item: item['start_datetime'],
+    ))
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 class WorkConfig(AppConfig):
 	default_auto_field = 'django.db.models.AutoField'
 	name = 'work'
+
+	def ready(self):
+		from . import signals  # noqa: F401
@@ -0,0 +1,74 @@
+"""GET conditionnels (ETag faible, Last-Modified, 304) pour les ViewSets à ``updated_at``.
+
+Le validateur d'une réponse est le couple ``(nombre de lignes, max(updated_at))``
+du queryset filtré, obtenu par un agrégat sans rien sérialiser : une création
+ou une modification fait avancer le max, une suppression fait baisser le
+nombre. Les relations imbriquées (enfants d'une tâche, tâches d'un projet)
+ajoutent leurs propres états via ``get_validators``.
+
+Sur une collection, seule l'ETag décide du 304 : ``If-Modified-Since`` ne
+verrait pas une suppression. ``Last-Modified`` reste envoyé à titre indicatif.
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+
+def aggregate_state(queryset, field='updated_at'):
+    state = queryset.order_by().aggregate(count=Count('pk'), last=Max(field))
+    return state['count'], state['last']
+
+
+class ConditionalGetMixin:
+    """``list`` / ``retrieve`` répondent 304 si le client a déjà l'état courant"""
+
+    def get_validators(self, queryset):
+        """États ``(count, last)`` dont dépend la réponse ; à compléter pour les relations imbriquées"""
+        return [aggregate_state(queryset)]
+
+    def _conditional(self, request, queryset, check_modified_since):
+        states = self.get_validators(queryset)
+        if check_modified_since and not states[0][0]:
+            # Objet absent : le 404 habituel l'emporte sur toute précondition
+            return None, None, None
+        digest = hashlib.sha1(repr((
+            type(self).__name__, request.user.pk, request.get_full_path(), request.accepted_media_type, states,
+        )).encode()).hexdigest()
+        etag = f'W/"{digest}"'
+        lasts = [last for _, last in states if last is not None]
+        last_modified = int(max(lasts).timestamp()) if lasts else None
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified if check_modified_since else None
+        )
+        return response, etag, last_modified
+
+    def _with_validators(self, response, etag, last_modified):
+        if etag is None:
+            return response
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        # Revalidation systématique, réponse propre à l'utilisateur
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ('Authorization',))
+        return response
+
+    def list(self, request, *args, **kwargs):
+        not_modified, etag, last_modified = self._conditional(
+            request, self.filter_queryset(self.get_queryset()), check_modified_since=False
+        )
+        if not_modified is not None:
+            return self._with_validators(not_modified, etag, last_modified)
+        return self._with_validators(super().list(request, *args, **kwargs), etag, last_modified)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: kwargs[lookup_url_kwarg]}
+        )
+        not_modified, etag, last_modified = self._conditional(request, queryset, check_modified_since=True)
+        if not_modified is not None:
+            return self._with_validators(not_modified, etag, last_modified)
+        return self._with_validators(super().retrieve(request, *args, **kwargs), etag, last_modified)
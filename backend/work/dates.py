@@ -0,0 +1,56 @@
+from datetime import date, datetime, time, timedelta
+
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+
+
+def parse_day(value, param='date'):
+    """Convertit un paramètre ``YYYY-MM-DD`` en date (400 si invalide)"""
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        raise ValidationError({param: 'Format attendu : YYYY-MM-DD.'})
+
+
+def parse_instant(value, param):
+    """``YYYY-MM-DD`` (minuit local) ou date-heure ISO 8601 en datetime aware (400 si invalide)"""
+    try:
+        parsed = parse_datetime(value or '')
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValidationError({param: 'Format attendu : YYYY-MM-DD ou date-heure ISO 8601.'})
+    return parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed)
+
+
+def local_midnight(day):
+    """Minuit du jour donné dans le fuseau courant (TIME_ZONE, Europe/Paris)"""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def day_window(start_date, end_date, max_days=None):
+    """Bornes aware [minuit de start_date, minuit du lendemain de end_date) ; 400 si incohérentes"""
+    start_day = parse_day(start_date, 'start_date')
+    end_day = parse_day(end_date, 'end_date')
+    if end_day < start_day:
+        raise ValidationError({'end_date': 'Doit être postérieure ou égale à start_date.'})
+    if max_days is not None and (end_day - start_day).days + 1 > max_days:
+        raise ValidationError({'end_date': f'Fenêtre limitée à {max_days} jours.'})
+    return local_midnight(start_day), local_midnight(end_day + timedelta(days=1))
+
+
+def day_range_filter(field, start_date=None, end_date=None):
+    """Lookups ``field__gte`` / ``field__lt`` couvrant les jours [start_date, end_date] inclus.
+
+    Équivalent à ``field__date__gte`` / ``field__date__lte`` mais sans conversion
+    de la colonne ligne par ligne, ce qui permet d'utiliser les index.
+    """
+    lookups = {}
+    if start_date:
+        lookups[f'{field}__gte'] = local_midnight(parse_day(start_date, 'start_date'))
+    if end_date:
+        lookups[f'{field}__lt'] = local_midnight(parse_day(end_date, 'end_date') + timedelta(days=1))
+    return lookups
@@ -0,0 +1,153 @@
+"""Diffusion des changements en temps réel (``/api/live/``, Server-Sent Events).
+
+Les signaux publient, après commit, de petits messages JSON (``type``, ``id``…)
+sur des canaux ``project:<id>`` (tâches, commentaires) et ``user:<id>``
+(timers, événements). Le flux est servi par une vue asynchrone
+(work.views_live) : il faut un serveur ASGI (``uvicorn backend.asgi:application``),
+qui ne sert que ce chemin, l'API restant sous WSGI (gunicorn).
+
+Le transport est choisi par ``LIVE_UPDATES_BACKEND`` : ``InProcessBackend``
+(défaut, abonnés du seul processus courant : développement avec
+``LIVE_ASGI_ONLY=0``) ou ``RedisBackend`` (pub/sub Redis, entre les processus
+WSGI qui publient et le processus ASGI qui diffuse). Un backend expose ``publish(channel, message)``
+(appelable depuis du code synchrone) et ``subscribe(patterns)`` (coroutine
+renvoyant un abonnement avec ``get(timeout)`` et ``close()``).
+"""
+import asyncio
+import fnmatch
+import json
+import logging
+import threading
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Envoyé à un abonné trop lent dont la file a débordé : il doit tout recharger
+RESYNC = json.dumps({'type': 'resync'})
+
+
+class InProcessBackend:
+    """Abonnés en mémoire : une file asyncio chacun, alimentée depuis n'importe quel thread"""
+
+    def __init__(self):
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            if subscription.matches(channel):
+                subscription.offer(message)
+
+    async def subscribe(self, patterns):
+        subscription = _InProcessSubscription(self, patterns)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def _discard(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+
+class _InProcessSubscription:
+    def __init__(self, backend, patterns):
+        self.backend, self.patterns = backend, tuple(patterns)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=settings.LIVE_QUEUE_SIZE)
+
+    def matches(self, channel):
+        return any(fnmatch.fnmatchcase(channel, pattern) for pattern in self.patterns)
+
+    def offer(self, message):
+        try:
+            self.loop.call_soon_threadsafe(self._put, message)
+        except RuntimeError:
+            # Boucle fermée : l'abonnement sera retiré par close()
+            pass
+
+    def _put(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+    async def get(self, timeout):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def close(self):
+        self.backend._discard(self)
+
+
+class RedisBackend:
+    """Pub/sub Redis (``REDIS_URL``) : les messages atteignent les abonnés de tous les workers"""
+    prefix = 'live:'
+
+    def __init__(self):
+        import redis
+
+        self.url = settings.REDIS_URL
+        self.client = redis.Redis.from_url(self.url)
+
+    def publish(self, channel, message):
+        self.client.publish(self.prefix + channel, message)
+
+    async def subscribe(self, patterns):
+        import redis.asyncio
+
+        client = redis.asyncio.Redis.from_url(self.url)
+        pubsub = client.pubsub()
+        await pubsub.psubscribe(*(self.prefix + pattern for pattern in patterns))
+        return _RedisSubscription(client, pubsub)
+
+
+class _RedisSubscription:
+    def __init__(self, client, pubsub):
+        self.client, self.pubsub = client, pubsub
+
+    async def get(self, timeout):
+        message = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        return message['data'].decode() if message else None
+
+    async def close(self):
+        await self.pubsub.aclose()
+        await self.client.aclose()
+
+
+@lru_cache(maxsize=None)
+def get_backend():
+    return import_string(settings.LIVE_UPDATES_BACKEND)()
+
+
+def publish(channels, type, **data):
+    """Publie ``{"type": type, **data}`` sur ``channels`` une fois la transaction validée"""
+    message = json.dumps({'type': type, **data}, cls=DjangoJSONEncoder)
+
+    def send():
+        backend = get_backend()
+        for channel in channels:
+            try:
+                backend.publish(channel, message)
+            except Exception:
+                # Le temps réel est un confort : un transport en panne ne fait pas échouer l'écriture
+                logger.warning("Publication sur %s impossible", channel, exc_info=True)
+
+    transaction.on_commit(send)
+
+
+def task_saved(task, created=False):
+    publish(
+        [f'project:{task.project_id}'], 'task.created' if created else 'task.updated',
+        id=task.pk, project=task.project_id, status=task.status, rank=task.rank,
+    )
@@ -0,0 +1,85 @@
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+from users.models import User
+from work.models import Project, Task, TimeEntry, Event
+
+
+class Command(BaseCommand):
+    help = (
+        "Affiche le plan d'exécution et la durée des requêtes chaudes (Task, TimeEntry, Event). "
+        "Lancer avant/après `migrate work 0005` / `migrate` pour comparer les index."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0,
+                            help="Nombre de tâches à générer (x10 entrées de temps et événements)")
+        parser.add_argument('--repeat', type=int, default=20, help="Nombre d'exécutions chronométrées")
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            self.seed(options['seed'])
+
+        user = User.objects.filter(personal_identifier='bench-0').first() or User.objects.first()
+        project = Project.objects.order_by('id').first()
+        if user is None or project is None:
+            self.stdout.write(self.style.WARNING("Aucune donnée : relancer avec --seed 10000"))
+            return
+
+        now = timezone.now()
+        queries = {
+            'tasks: project+status, -updated_at': Task.objects.filter(project=project, status='doing').order_by('-updated_at')[:100],
+            'tasks: assignee+status, -updated_at': Task.objects.filter(assignee=user, status='todo').order_by('-updated_at')[:100],
+            'tasks: -updated_at': Task.objects.order_by('-updated_at', '-id')[:100],
+            'time entries: user, 30 days': TimeEntry.objects.filter(
+                user=user, started_at__gte=now - timedelta(days=30), started_at__lt=now,
+            ).order_by('-started_at'),
+            'events: user, month window': Event.objects.filter(
+                user=user, start_datetime__lt=now + timedelta(days=31), end_datetime__gte=now,
+            ).order_by('start_datetime'),
+        }
+
+        self.stdout.write(f"Base : {connection.vendor} — {Task.objects.count()} tâches, "
+                          f"{TimeEntry.objects.count()} entrées, {Event.objects.count()} événements")
+        for label, qs in queries.items():
+            started = time.perf_counter()
+            for _ in range(options['repeat']):
+                list(qs.all())
+            elapsed = (time.perf_counter() - started) * 1000 / options['repeat']
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n{label} — {elapsed:.2f} ms"))
+            self.stdout.write(qs.explain())
+
+    def seed(self, n_tasks):
+        self.stdout.write(f"Génération de {n_tasks} tâches…")
+        rng = random.Random(42)
+        users = [
+            User.objects.get_or_create(personal_identifier=f'bench-{i}')[0]
+            for i in range(10)
+        ]
+        projects = Project.objects.bulk_create(
+            Project(name=f'Bench {i}') for i in range(max(1, n_tasks // 200))
+        )
+        statuses = [choice for choice, _ in Task.STATUS_CHOICES]
+        priorities = [choice for choice, _ in Task.PRIORITY_CHOICES]
+        tasks = Task.objects.bulk_create(
+            (Task(project=rng.choice(projects), title=f'Bench task {i}', assignee=rng.choice(users),
+                  status=rng.choice(statuses), priority=rng.choice(priorities))
+             for i in range(n_tasks)),
+            batch_size=1000,
+        )
+        now = timezone.now()
+        entries, events = [], []
+        for _ in range(n_tasks * 10):
+            started = now - timedelta(minutes=rng.randrange(0, 60 * 24 * 730))
+            duration = rng.randrange(5, 240)
+            entries.append(TimeEntry(task=rng.choice(tasks), user=rng.choice(users), started_at=started,
+                                     ended_at=started + timedelta(minutes=duration), duration_minutes=duration))
+            start = now + timedelta(minutes=rng.randrange(-60 * 24 * 365, 60 * 24 * 365))
+            events.append(Event(title='Bench', user=rng.choice(users), start_datetime=start,
+                                end_datetime=start + timedelta(minutes=rng.randrange(15, 180))))
+        TimeEntry.objects.bulk_create(entries, batch_size=1000)
+        Event.objects.bulk_create(events, batch_size=1000)
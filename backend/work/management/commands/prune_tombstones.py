@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from work import sync
+
+
+class Command(BaseCommand):
+    help = "Supprime les tombstones de synchronisation plus anciens que SYNC_TOMBSTONE_RETENTION_DAYS"
+
+    def handle(self, *args, **options):
+        count = sync.prune()
+        self.stdout.write(self.style.SUCCESS(f"{count} tombstone(s) supprimé(s)"))
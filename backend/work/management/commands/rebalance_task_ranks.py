@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.db.models.functions import Length
+from work.models import Task
+from work.ranking import rebalance
+
+
+class Command(BaseCommand):
+    help = "Rééquilibre les clés de rang des colonnes du kanban devenues trop longues (à lancer périodiquement)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-length', type=int, default=settings.TASK_RANK_MAX_LENGTH,
+                            help="Longueur de clé au-delà de laquelle une colonne est rééquilibrée")
+        parser.add_argument('--all', action='store_true', help="Rééquilibrer toutes les colonnes")
+
+    def handle(self, *args, **options):
+        columns = (
+            Task.objects.order_by().values('project_id', 'status')
+            .annotate(longest=Max(Length('rank')), unranked=Count('id', filter=Q(rank='')))
+        )
+        if not options['all']:
+            columns = columns.filter(Q(longest__gt=options['max_length']) | Q(unranked__gt=0))
+        total = 0
+        for column in columns:
+            with transaction.atomic():
+                tasks = Task.objects.select_for_update().filter(project_id=column['project_id'], status=column['status'])
+                total += rebalance(tasks)
+        self.stdout.write(self.style.SUCCESS(f"{total} tâche(s) reclassée(s)"))
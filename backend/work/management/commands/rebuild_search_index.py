@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from work import search
+
+
+class Command(BaseCommand):
+    help = "Reconstruit l'index de recherche plein texte (projets, tâches, docs, commentaires, événements)"
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            count = search.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"{count} entrée(s) indexée(s)"))
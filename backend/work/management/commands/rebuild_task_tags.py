@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from work import tagging
+
+
+class Command(BaseCommand):
+    help = "Reconstruit la table TaskTag à partir de Task.tags"
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            count = tagging.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"{count} tag(s) de tâche indexé(s)"))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+from users.models import User
+from work import rollups
+from work.models import DailyTimeRollup
+
+
+class Command(BaseCommand):
+    help = "Recalcule la table DailyTimeRollup à partir des TimeEntry"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help="personal_identifier d'un utilisateur à recalculer seul")
+
+    def handle(self, *args, **options):
+        user = None
+        if options['user']:
+            user = User.objects.filter(personal_identifier=options['user']).first()
+            if user is None:
+                raise CommandError(f"Utilisateur introuvable : {options['user']}")
+        rollups.rebuild(user)
+        count = DailyTimeRollup.objects.filter(**({'user': user} if user else {})).count()
+        self.stdout.write(self.style.SUCCESS(f"{count} lignes de rollup recalculées"))
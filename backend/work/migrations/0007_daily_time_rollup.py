@@ -0,0 +1,57 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:52
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def build_rollups(apps, schema_editor):
+    """Agrège les TimeEntry existantes par (utilisateur, tâche, jour local)"""
+    TimeEntry = apps.get_model('work', 'TimeEntry')
+    DailyTimeRollup = apps.get_model('work', 'DailyTimeRollup')
+    rows = (
+        TimeEntry.objects.order_by()
+        .annotate(day=TruncDate('started_at', tzinfo=timezone.get_current_timezone()))
+        .values('user_id', 'task_id', 'day', project=F('task__project_id'))
+        .annotate(minutes=Sum('duration_minutes'), entries=Count('id'))
+    )
+    DailyTimeRollup.objects.bulk_create(
+        [DailyTimeRollup(user_id=row['user_id'], task_id=row['task_id'], project_id=row['project'],
+                         day=row['day'], minutes=row['minutes'] or 0, entry_count=row['entries'])
+         for row in rows],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('work', '0006_hot_path_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyTimeRollup',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('minutes', models.IntegerField(default=0)),
+                ('entry_count', models.IntegerField(default=0)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='time_rollups', to='work.project')),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='time_rollups', to='work.task')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='time_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'day'], name='rollup_user_day_idx'), models.Index(fields=['project', 'day'], name='rollup_project_day_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailytimerollup',
+            constraint=models.UniqueConstraint(fields=('user', 'task', 'day'), name='rollup_user_task_day_uniq'),
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
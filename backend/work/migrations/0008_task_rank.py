@@ -0,0 +1,55 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+# Figé à la date de la migration (work.ranking.spread_keys peut évoluer)
+DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+
+def spread_keys(count):
+    base = len(DIGITS)
+    width = 1
+    while base ** width <= count * 2:
+        width += 1
+    step = base ** width // (count + 1)
+    keys = []
+    for position in range(1, count + 1):
+        value, digits = position * step, []
+        for _ in range(width):
+            value, digit = divmod(value, base)
+            digits.append(DIGITS[digit])
+        keys.append(''.join(reversed(digits)).rstrip('0'))
+    return keys
+
+
+def assign_ranks(apps, schema_editor):
+    """Range les tâches existantes de chaque colonne dans l'ordre actuel du board (-updated_at)"""
+    Task = apps.get_model('work', 'Task')
+    columns = Task.objects.order_by().values_list('project_id', 'status').distinct()
+    for project_id, status in columns:
+        tasks = list(Task.objects.filter(project_id=project_id, status=status).order_by('-updated_at', '-id').only('id'))
+        for task, key in zip(tasks, spread_keys(len(tasks))):
+            task.rank = key
+        Task.objects.bulk_update(tasks, ['rank'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('work', '0007_daily_time_rollup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='rank',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', 'status', 'rank'], name='task_project_status_rank_idx'),
+        ),
+        migrations.RunPython(assign_ranks, migrations.RunPython.noop),
+    ]
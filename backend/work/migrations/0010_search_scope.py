@@ -0,0 +1,53 @@
+# Generated by Django 5.0.6 on 2026-10-18 12:03
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# Sources indexées à la date de la migration (figées : work.search.SOURCES peut évoluer)
+# type -> (modèle, champ titre, champ corps, propriétaire)
+SOURCES = {
+    'project': ('Project', 'name', 'description', ''),
+    'task': ('Task', 'title', 'description', ''),
+    'doc': ('Doc', 'title', 'content', ''),
+    'comment': ('Comment', '', 'content', ''),
+    'event': ('Event', 'title', 'description', 'user_id'),
+}
+
+
+def build_entries(apps, schema_editor, batch_size=1000):
+    SearchEntry = apps.get_model('work', 'SearchEntry')
+    SearchEntry.objects.all().delete()
+    for kind, (name, title_field, body_field, owner_field) in SOURCES.items():
+        fields = ['pk'] + [f for f in (title_field, body_field, owner_field) if f]
+        rows = apps.get_model('work', name).objects.order_by('pk').values_list(*fields)
+        batch = []
+        for row in rows.iterator(chunk_size=batch_size):
+            values = dict(zip(fields, row))
+            batch.append(SearchEntry(
+                kind=kind, object_id=values['pk'],
+                title=values.get(title_field) or '', body=values.get(body_field) or '',
+                user_id=values.get(owner_field),
+            ))
+            if len(batch) >= batch_size:
+                SearchEntry.objects.bulk_create(batch)
+                batch = []
+        SearchEntry.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('work', '0009_search_entry'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='searchentry',
+            name='user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        # Indexe l'existant, projets et événements compris
+        migrations.RunPython(build_entries, migrations.RunPython.noop),
+    ]
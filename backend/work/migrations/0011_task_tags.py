@@ -0,0 +1,50 @@
+# Generated by Django 5.0.6 on 2026-10-18 12:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+MAX_LENGTH = 100
+
+
+def build_tags(apps, schema_editor, batch_size=1000):
+    """Remplit TaskTag depuis Task.tags (normalisation figée à la date de la migration)"""
+    Task = apps.get_model('work', 'Task')
+    TaskTag = apps.get_model('work', 'TaskTag')
+    rows = []
+    for pk, tags in Task.objects.order_by('pk').values_list('pk', 'tags').iterator(chunk_size=batch_size):
+        seen = []
+        for tag in tags or []:
+            tag = str(tag).strip()[:MAX_LENGTH]
+            if tag and tag not in seen:
+                seen.append(tag)
+        rows += [TaskTag(task_id=pk, tag=tag) for tag in seen]
+        if len(rows) >= batch_size:
+            TaskTag.objects.bulk_create(rows)
+            rows = []
+    TaskTag.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('work', '0010_search_scope'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskTag',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tag', models.CharField(max_length=100)),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tag_rows', to='work.task')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['tag', 'task'], name='tasktag_tag_task_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='tasktag',
+            constraint=models.UniqueConstraint(fields=('task', 'tag'), name='tasktag_task_tag_uniq'),
+        ),
+        migrations.RunPython(build_tags, migrations.RunPython.noop),
+    ]
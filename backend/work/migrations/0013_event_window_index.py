@@ -0,0 +1,19 @@
+# Generated by Django 5.0.6 on 2026-10-18 12:08
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('work', '0012_event_exception'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['user', 'is_recurring', 'start_datetime', 'end_datetime'], name='event_user_window_idx'),
+        ),
+    ]
@@ -24,6 +24,11 @@ class Project(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at'], name='project_updated_idx'),
+        ]
+
     def __str__(self) -> str:
         return self.name
 
@@ -39,27 +44,79 @@ class Task(models.Model):
     priority = models.CharField(max_length=20, choices=PRIORITY_CHOICES, default="medium")
     due_date = models.DateField(null=True, blank=True)
     tags = models.JSONField(default=list, blank=True)
+    # Clé de rang fractionnaire dans la colonne (voir work.ranking)
+    rank = models.CharField(max_length=255, blank=True, default='')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['project', 'status', 'rank'], name='task_project_status_rank_idx'),
+            # Filtres du kanban (projet, statut) triés par dernière modification
+            models.Index(fields=['project', 'status', '-updated_at'], name='task_project_status_upd_idx'),
+            models.Index(fields=['assignee', 'status', '-updated_at'], name='task_assignee_status_upd_idx'),
+            models.Index(fields=['-updated_at', '-id'], name='task_updated_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Projet au chargement : un déplacement doit aussi rafraîchir l'ancien projet (work.project_stats)
+        instance._loaded_project_id = instance.__dict__.get('project_id')
+        return instance
+
     def __str__(self) -> str:
         return self.title
 
+class TaskTag(models.Model):
+    """Tags de ``Task.tags`` normalisés pour le filtrage indexé — maintenu par work.tagging"""
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='tag_rows')
+    tag = models.CharField(max_length=100)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['task', 'tag'], name='tasktag_task_tag_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['tag', 'task'], name='tasktag_tag_task_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.task_id} #{self.tag}"
+
 class SubTask(models.Model):
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="subtasks")
     title = models.CharField(max_length=200)
     is_done = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at'], name='subtask_updated_idx'),
+        ]
 
 class Comment(models.Model):
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="comments")
     author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True)
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at'], name='comment_updated_idx'),
+        ]
 
 class Attachment(models.Model):
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="attachments")
     file = models.FileField(upload_to="attachments/")
     uploaded_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at'], name='attachment_updated_idx'),
+        ]
 
 class Doc(models.Model):
     CATEGORY_CHOICES = [("ideas", "Ideas"), ("tech", "Technical"), ("process", "Process"), ("templates", "Templates"), ("snippets", "Snippets")]
@@ -70,6 +127,11 @@ class Doc(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at'], name='doc_updated_idx'),
+        ]
+
 class TimeEntry(models.Model):
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="time_entries")
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
@@ -81,6 +143,9 @@ class TimeEntry(models.Model):
     
     class Meta:
         ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['user', '-started_at'], name='timeentry_user_started_idx'),
+        ]
     
     def __str__(self):
         return f"{self.task.title} - {self.duration_minutes}min"
@@ -98,6 +163,66 @@ class TimeEntry(models.Model):
             self.save()
 
 
+
+class DailyTimeRollup(models.Model):
+    """Temps agrégé par utilisateur, tâche et jour local — maintenu par les signaux de TimeEntry"""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='time_rollups')
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='time_rollups')
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='time_rollups')
+    day = models.DateField()
+    minutes = models.IntegerField(default=0)
+    entry_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'task', 'day'], name='rollup_user_task_day_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'day'], name='rollup_user_day_idx'),
+            models.Index(fields=['project', 'day'], name='rollup_project_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.task_id} - {self.minutes}min"
+
+
+class SearchEntry(models.Model):
+    """Texte indexé pour la recherche plein texte — maintenu par les signaux (voir work.search)"""
+    kind = models.CharField(max_length=20)
+    object_id = models.PositiveIntegerField()
+    title = models.CharField(max_length=255, blank=True)
+    body = models.TextField(blank=True)
+    # Propriétaire des entrées privées (événements) ; vide = visible de tous
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='searchentry_kind_object_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id}"
+
+
+class Tombstone(models.Model):
+    """Suppression d'un objet synchronisé — écrite par les signaux et la purge (voir work.sync)"""
+    kind = models.CharField(max_length=20)
+    object_id = models.PositiveIntegerField()
+    # Propriétaire des objets privés (événements) ; vide = visible de tous
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    # Tâche d'un enfant supprimé (sous-tâche, commentaire, pièce jointe) : renvoyée à la synchronisation
+    parent_id = models.PositiveIntegerField(null=True, blank=True)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['deleted_at'], name='tombstone_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id}"
+
+
 class Timer(models.Model):
     """Timer actif pour une tâche - un seul par utilisateur"""
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='active_timer')
@@ -187,6 +312,13 @@ class Event(models.Model):
     
     class Meta:
         ordering = ['start_datetime']
+        indexes = [
+            models.Index(fields=['user', 'start_datetime'], name='event_user_start_idx'),
+            models.Index(fields=['user', 'end_datetime'], name='event_user_end_idx'),
+            # Chevauchement d'une fenêtre : start < fin AND end > début, évalué dans l'index
+            models.Index(fields=['user', 'is_recurring', 'start_datetime', 'end_datetime'], name='event_user_window_idx'),
+            models.Index(fields=['user', 'updated_at'], name='event_user_updated_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.start_datetime.strftime('%Y-%m-%d %H:%M')}"
@@ -198,6 +330,26 @@ class Event(models.Model):
             return int(delta.total_seconds() / 60)
         return 0
 
+class EventException(models.Model):
+    """Occurrence d'un événement récurrent annulée ou déplacée (voir work.recurrence)"""
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='exceptions')
+    # Début de l'occurrence tel que prévu par la règle
+    occurrence_start = models.DateTimeField()
+    is_cancelled = models.BooleanField(default=True)
+    start_datetime = models.DateTimeField(null=True, blank=True)
+    end_datetime = models.DateTimeField(null=True, blank=True)
+    title = models.CharField(max_length=200, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['occurrence_start']
+        constraints = [
+            models.UniqueConstraint(fields=['event', 'occurrence_start'], name='eventexception_event_occurrence_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.event_id} @ {self.occurrence_start:%Y-%m-%d %H:%M}"
+
 class Schedule(models.Model):
     """Template d'emploi du temps hebdomadaire"""
     DAYS_OF_WEEK = [
@@ -0,0 +1,49 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class WorkCursorPagination(CursorPagination):
+    """Pagination par curseur (keyset) sur l'ordre déclaré par le ViewSet.
+
+    Le ViewSet indique son ordre via l'attribut ``ordering`` (ou une méthode
+    ``get_ordering`` s'il dépend de la requête) ; le dernier champ
+    (``id``) départage les égalités pour que les pages restent stables même si
+    des lignes sont insérées entre deux appels.
+    ``?page_size=`` ajuste la taille de page, ``?paginate=false`` désactive
+    la pagination pour les appels internes du personnel (``is_staff``) ; pour
+    les autres, elle donne des pages de ``max_page_size``.
+    """
+    page_size = settings.API_PAGE_SIZE
+    max_page_size = settings.API_MAX_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    opt_out_query_param = 'paginate'
+
+    def opted_out(self, request):
+        return request.query_params.get(self.opt_out_query_param, '').lower() in ('0', 'false', 'no')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.opted_out(request) and request.user.is_staff:
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_page_size(self, request):
+        if self.opted_out(request):
+            return self.max_page_size
+        return super().get_page_size(request)
+
+    def get_ordering(self, request, queryset, view):
+        ordering = view.get_ordering() if hasattr(view, 'get_ordering') else getattr(view, 'ordering', None)
+        if ordering:
+            return (ordering,) if isinstance(ordering, str) else tuple(ordering)
+        return super().get_ordering(request, queryset, view)
+
+
+class SearchPagination(PageNumberPagination):
+    """Pages numérotées pour les résultats classés par pertinence (``?page=``).
+
+    Le score n'est pas une clé de curseur stable : la recherche pagine par
+    décalage, avec le nombre total de résultats dans ``count``.
+    """
+    page_size = settings.API_PAGE_SIZE
+    max_page_size = settings.API_MAX_PAGE_SIZE
+    page_size_query_param = 'page_size'
@@ -0,0 +1,85 @@
+"""Statistiques d'avancement des projets, servies avec ``/api/projects/``.
+
+Les compteurs de tâches sont calculés par agrégation conditionnelle en une
+requête pour tous les projets manquants du cache ; le temps saisi est lu dans
+les rollups journaliers (sous-requête). Le résultat est mis en cache par
+(projet, version, jour local). La version est celle de la portée
+``project-stats:<id>`` de work.response_cache : les écritures de tâches et de
+temps la font avancer (signaux, action groupée, purge) sans toucher à
+``Project.updated_at``, qui reste la date de modification du projet. Le
+retard dépend du jour.
+"""
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, IntegerField, Min, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import response_cache
+from .models import DailyTimeRollup, Project, Task
+
+STATUSES = [status for status, _ in Task.STATUS_CHOICES]
+
+
+SCOPE = 'project-stats:%s'
+
+
+def versions(project_ids):
+    """Version courante des statistiques de chaque projet (``{id: version}``)"""
+    project_ids = list(project_ids)
+    return dict(zip(project_ids, response_cache.versions([SCOPE % pk for pk in project_ids])))
+
+
+def last_change(project_ids):
+    """Instant de la dernière invalidation des statistiques de ces projets (les versions sont des
+    horodatages en nanosecondes), pour Last-Modified ; ``None`` sans projet"""
+    found = versions(project_ids).values()
+    return datetime.fromtimestamp(max(found) / 1e9, tz=dt_timezone.utc) if found else None
+
+
+def invalidate(project_ids):
+    """Fait avancer la version des statistiques des projets donnés, après commit"""
+    response_cache.bump(*{SCOPE % pk for pk in project_ids if pk is not None})
+
+
+def _cache_key(pk, version, today):
+    return 'project-stats:%s:%s:%s' % (pk, version, today.isoformat())
+
+
+def _compute(project_ids, today):
+    open_tasks = Q(tasks__status__in=[status for status in STATUSES if status != 'done'])
+    minutes = (
+        DailyTimeRollup.objects.filter(project=OuterRef('pk')).order_by().values('project')
+        .annotate(total=Sum('minutes')).values('total')
+    )
+    rows = Project.objects.filter(pk__in=project_ids).order_by().values('pk').annotate(
+        **{f'count_{status}': Count('tasks', filter=Q(tasks__status=status)) for status in STATUSES},
+        overdue_count=Count('tasks', filter=open_tasks & Q(tasks__due_date__lt=today)),
+        next_deadline=Min('tasks__due_date', filter=open_tasks & Q(tasks__due_date__gte=today)),
+        logged_minutes=Coalesce(Subquery(minutes, output_field=IntegerField()), 0),
+    )
+    return {
+        row['pk']: {
+            'task_counts_by_status': {status: row[f'count_{status}'] for status in STATUSES},
+            'overdue_count': row['overdue_count'],
+            'logged_minutes': row['logged_minutes'],
+            'next_deadline': row['next_deadline'],
+        }
+        for row in rows
+    }
+
+
+def stats_for(projects):
+    """Statistiques par identifiant de projet, via le cache"""
+    today = timezone.localdate()
+    keys = {pk: _cache_key(pk, version, today) for pk, version in versions(project.pk for project in projects).items()}
+    cached = cache.get_many(keys.values())
+    result = {pk: cached[key] for pk, key in keys.items() if key in cached}
+    missing = [pk for pk in keys if pk not in result]
+    if missing:
+        computed = _compute(missing, today)
+        cache.set_many({keys[pk]: stats for pk, stats in computed.items()}, settings.PROJECT_STATS_CACHE_TIMEOUT)
+        result.update(computed)
+    return result
@@ -0,0 +1,68 @@
+"""Clés de rang fractionnaires pour l'ordre des tâches dans une colonne du kanban.
+
+Les clés sont des chaînes en base 36 (``0-9a-z``, même ordre quelle que soit la
+collation) comparées lexicographiquement. Une clé ne se termine jamais par
+``0`` : il existe donc toujours une clé entre deux clés distinctes, et déplacer
+une tâche ne modifie qu'une ligne.
+"""
+DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+BASE = len(DIGITS)
+
+
+def key_between(lower=None, upper=None):
+    """Clé strictement comprise entre ``lower`` et ``upper`` (``None`` = pas de borne)"""
+    lower = lower or ''
+    if upper is not None and lower >= upper:
+        raise ValueError(f"Bornes invalides : {lower!r} >= {upper!r}")
+    key = ''
+    index = 0
+    while True:
+        low = DIGITS.index(lower[index]) if index < len(lower) else 0
+        high = DIGITS.index(upper[index]) if upper is not None and index < len(upper) else BASE
+        if low == high:
+            key += DIGITS[low]
+            index += 1
+            continue
+        middle = (low + high) // 2
+        if middle > low:
+            return key + DIGITS[middle]
+        # Chiffres consécutifs : on garde celui du bas et on cherche au-dessus du reste de ``lower``
+        key += DIGITS[low]
+        index += 1
+        upper = None
+
+
+def spread_keys(count):
+    """``count`` clés croissantes, uniformément réparties (utilisé pour rééquilibrer)"""
+    width = 1
+    while BASE ** width <= count * 2:
+        width += 1
+    step = BASE ** width // (count + 1)
+    keys = []
+    for position in range(1, count + 1):
+        value, digits = position * step, []
+        for _ in range(width):
+            value, digit = divmod(value, BASE)
+            digits.append(DIGITS[digit])
+        keys.append(''.join(reversed(digits)).rstrip('0'))
+    return keys
+
+
+def rebalance(tasks):
+    """Réattribue des clés courtes et régulières aux tâches d'une colonne, en conservant leur ordre.
+
+    ``updated_at`` avance sur les tâches reclassées (ETag, synchronisation incrémentale).
+    """
+    from django.utils import timezone
+
+    from .models import Task
+
+    tasks = list(tasks.order_by('rank', '-updated_at', '-id').only('id', 'rank'))
+    now = timezone.now()
+    changed = []
+    for task, key in zip(tasks, spread_keys(len(tasks))):
+        if task.rank != key:
+            task.rank, task.updated_at = key, now
+            changed.append(task)
+    Task.objects.bulk_update(changed, ['rank', 'updated_at'], batch_size=1000)
+    return len(changed)
@@ -0,0 +1,226 @@
+"""Expansion des événements récurrents (``Event.recurrence_rule``, syntaxe RRULE).
+
+Les règles sont déroulées en heure locale (une réunion hebdomadaire à 9h
+reste à 9h après un changement d'heure) et uniquement sur la fenêtre
+demandée. Les lignes ``EXDATE`` / ``RDATE`` de la règle sont prises en
+compte, ainsi que les ``EventException`` (occurrence annulée ou déplacée).
+
+Le résultat est mis en cache par (événement, updated_at, fenêtre) : toute
+modification de l'événement ou de ses exceptions change ``updated_at`` et
+rend les anciennes entrées inaccessibles, sans invalidation explicite.
+
+Le coût ne dépend pas de l'ancienneté de l'événement : quand la règle le
+permet, DTSTART est avancé à la dernière période alignée avant la fenêtre,
+et le nombre d'itérations est de toute façon borné (``EVENT_MAX_ITERATIONS``).
+Les fréquences inférieures au jour sont refusées à la validation.
+"""
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from dateutil.relativedelta import relativedelta
+from dateutil.rrule import rrulestr
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+Occurrence = namedtuple('Occurrence', 'event start end occurrence_start title is_exception')
+
+REJECTED_FREQUENCIES = ('SECONDLY', 'MINUTELY', 'HOURLY')
+_STEPS = {'WEEKLY': timedelta(weeks=1), 'DAILY': timedelta(days=1), 'HOURLY': timedelta(hours=1),
+          'MINUTELY': timedelta(minutes=1), 'SECONDLY': timedelta(seconds=1)}
+_MONTHS = {'YEARLY': 12, 'MONTHLY': 1}
+
+
+def _rules(rule):
+    """Paramètres (``{'FREQ': ..., ...}``) de chaque ligne RRULE / EXRULE de ``rule``, avec son nom"""
+    result = []
+    for line in rule.upper().split():
+        name, _, value = line.rpartition(':')
+        if name in ('', 'RRULE', 'EXRULE'):
+            params = dict(part.split('=', 1) for part in value.split(';') if '=' in part)
+            result.append((name or 'RRULE', params))
+        elif name.startswith('DTSTART'):
+            result.append(('DTSTART', {}))
+    return result
+
+
+def _aligned_start(rule, local_start, local_after):
+    """Dernier début de période de ``rule`` (aligné sur ``local_start``) avant ``local_after``.
+
+    Seulement pour une RRULE unique sans COUNT (qui compte depuis le vrai
+    début) ni EXRULE ; sinon ``local_start`` est rendu tel quel. Le calcul se
+    fait en heure murale, comme le déroulement de dateutil.
+    """
+    rules = _rules(rule)
+    if len(rules) != 1 or rules[0][0] != 'RRULE' or 'COUNT' in rules[0][1] or local_after <= local_start:
+        return local_start
+    params = rules[0][1]
+    freq, interval = params.get('FREQ'), int(params.get('INTERVAL') or 1)
+    start, after = local_start.replace(tzinfo=None), local_after.replace(tzinfo=None)
+    if freq in _STEPS:
+        step = _STEPS[freq] * interval
+        shifted = start + step * ((after - start) // step)
+    elif freq in _MONTHS:
+        unit = _MONTHS[freq] * interval
+        periods = ((after.year - start.year) * 12 + after.month - start.month) // unit
+        shifted = start + relativedelta(months=periods * unit)
+        # Jour absent du mois visé (31, 29 février) ou période entamée après ``after`` : période précédente
+        while periods > 0 and (shifted.day != start.day or shifted > after):
+            periods -= 1
+            shifted = start + relativedelta(months=periods * unit)
+    else:
+        return local_start
+    return shifted.replace(tzinfo=local_start.tzinfo)
+
+
+def parse_rule(rule, start, after=None):
+    """Ensemble d'occurrences de ``rule`` à partir de ``start`` (aware), dates renvoyées aware.
+
+    ``UNTIL`` doit être en UTC (``Z``) pour un début daté ; une règle
+    « flottante » (UNTIL sans fuseau) est déroulée en heure locale naïve.
+    ``after`` : premier instant qui sera lu ; les périodes entières qui le
+    précèdent ne sont pas déroulées. Lève ``ValueError`` si la règle est invalide.
+    """
+    local_start = timezone.localtime(start)
+    if after is not None:
+        local_start = _aligned_start(rule, local_start, timezone.localtime(after))
+    try:
+        return _Rule(rrulestr(rule, dtstart=local_start, forceset=True), aware=True)
+    except ValueError:
+        naive = rrulestr(rule, dtstart=local_start.replace(tzinfo=None), forceset=True)
+        return _Rule(naive, aware=False)
+
+
+class _Rule:
+    def __init__(self, ruleset, aware):
+        self.ruleset, self.aware = ruleset, aware
+
+    def _in(self, value):
+        value = timezone.localtime(value)
+        return value if self.aware else value.replace(tzinfo=None)
+
+    def _out(self, value):
+        return value if self.aware else timezone.make_aware(value)
+
+    def _iterate(self):
+        # Itérations bornées, occurrences hors fenêtre comprises (xafter parcourt tout depuis DTSTART)
+        for count, value in enumerate(self.ruleset):
+            if count >= settings.EVENT_MAX_ITERATIONS:
+                return
+            yield value
+
+    def between(self, after, before, limit):
+        """Débuts d'occurrence dans [after, before), ``limit`` au plus"""
+        result = []
+        after = self._in(after)
+        for value in self._iterate():
+            if value < after:
+                continue
+            value = self._out(value)
+            if value >= before or len(result) >= limit:
+                break
+            result.append(value)
+        return result
+
+    def includes(self, value):
+        value = self._in(value)
+        for candidate in self._iterate():
+            if candidate >= value:
+                return candidate == value
+        return False
+
+
+def validate_rule(rule, start):
+    """Message d'erreur si la règle n'est pas exploitable, sinon ``None``"""
+    try:
+        parse_rule(rule, start or timezone.now())
+    except (ValueError, TypeError) as exc:
+        return f"Règle de récurrence invalide : {exc}"
+    if any(params.get('FREQ') in REJECTED_FREQUENCIES for _, params in _rules(rule)):
+        return "Règle de récurrence invalide : fréquence inférieure au jour non prise en charge."
+    return None
+
+
+def expand(event, window_start, window_end, exceptions=()):
+    """Occurrences de ``event`` chevauchant [window_start, window_end)"""
+    duration = event.end_datetime - event.start_datetime
+    if not (event.is_recurring and event.recurrence_rule):
+        return expand_single(event, window_start, window_end)
+    try:
+        rule = parse_rule(event.recurrence_rule, event.start_datetime, after=window_start - duration)
+    except (ValueError, TypeError):
+        # Règle illisible (antérieure à la validation) : l'événement reste ponctuel
+        return expand_single(event, window_start, window_end)
+    overrides = {exception.occurrence_start: exception for exception in exceptions}
+    limit = settings.EVENT_MAX_OCCURRENCES
+    starts = rule.between(window_start - duration, window_end, limit)
+    result = []
+    for start in starts:
+        exception = overrides.pop(start, None)
+        if exception is None:
+            if start + duration > window_start:
+                result.append(Occurrence(event, start, start + duration, start, event.title, False))
+        elif not exception.is_cancelled:
+            result.append(_moved(event, start, duration, exception))
+    # Occurrences déplacées depuis l'extérieur de la fenêtre
+    for original, exception in overrides.items():
+        if exception.is_cancelled:
+            continue
+        if parse_rule(event.recurrence_rule, event.start_datetime, after=original).includes(original):
+            result.append(_moved(event, original, duration, exception))
+    return [o for o in result if o.start < window_end and o.end > window_start]
+
+
+def expand_single(event, window_start, window_end):
+    if event.start_datetime < window_end and event.end_datetime > window_start:
+        return [Occurrence(event, event.start_datetime, event.end_datetime, event.start_datetime, event.title, False)]
+    return []
+
+
+def _moved(event, original, duration, exception):
+    start = exception.start_datetime or original
+    end = exception.end_datetime or start + duration
+    return Occurrence(event, start, end, original, exception.title or event.title, True)
+
+
+def _cache_key(event, window_start, window_end):
+    return 'event-occurrences:%s:%s:%s:%s' % (
+        event.pk, event.updated_at.timestamp(), window_start.timestamp(), window_end.timestamp()
+    )
+
+
+def _pack(occurrence):
+    return (occurrence.start.timestamp(), occurrence.end.timestamp(),
+            occurrence.occurrence_start.timestamp(), occurrence.title, occurrence.is_exception)
+
+
+def _unpack(event, row):
+    start, end, original, title, is_exception = row
+    start, end, original = (datetime.fromtimestamp(value, tz=dt_timezone.utc) for value in (start, end, original))
+    return Occurrence(event, start, end, original, title, is_exception)
+
+
+def occurrences(events, window_start, window_end):
+    """Occurrences triées de plusieurs événements, via le cache pour les récurrents"""
+    from .models import EventException
+
+    recurring = [event for event in events if event.is_recurring and event.recurrence_rule]
+    keys = {event.pk: _cache_key(event, window_start, window_end) for event in recurring}
+    cached = cache.get_many(keys.values())
+    missing = [event for event in recurring if keys[event.pk] not in cached]
+    exceptions = {}
+    for exception in EventException.objects.filter(event__in=[event.pk for event in missing]):
+        exceptions.setdefault(exception.event_id, []).append(exception)
+
+    result, to_cache = [], {}
+    for event in events:
+        if event.pk in keys and keys[event.pk] in cached:
+            result += [_unpack(event, row) for row in cached[keys[event.pk]]]
+            continue
+        expanded = expand(event, window_start, window_end, exceptions.get(event.pk, ()))
+        if event.pk in keys:
+            to_cache[keys[event.pk]] = [_pack(occurrence) for occurrence in expanded]
+        result += expanded
+    if to_cache:
+        cache.set_many(to_cache, settings.EVENT_OCCURRENCE_CACHE_TIMEOUT)
+    return sorted(result, key=lambda o: (o.start, o.event.pk))
@@ -0,0 +1,120 @@
+from datetime import timedelta
+
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate, TruncMonth, TruncWeek
+from django.utils import timezone
+
+
+def entry_rows(entries, *group_by):
+    """Minutes et nombre d'entrées par (tâche, jour local), en une seule requête groupée.
+
+    ``group_by`` ajoute des colonnes au regroupement (par exemple ``user_id``).
+    """
+    return (
+        entries.order_by()
+        .annotate(day=TruncDate('started_at', tzinfo=timezone.get_current_timezone()))
+        .values('day', 'task_id', *group_by, task_title=F('task__title'),
+                project_id=F('task__project_id'), project_name=F('task__project__name'))
+        .annotate(minutes=Sum('duration_minutes'), entries=Count('id'))
+    )
+
+
+def rollup_rows(rollups):
+    """Mêmes lignes que ``entry_rows`` mais lues dans la table pré-agrégée DailyTimeRollup"""
+    return (
+        rollups.order_by()
+        .values('day', 'task_id', 'project_id',
+                task_title=F('task__title'), project_name=F('project__name'))
+        .annotate(minutes=Sum('minutes'), entries=Sum('entry_count'))
+    )
+
+
+# Dimensions de regroupement du rapport d'équipe : colonnes sélectionnées pour chacune
+TEAM_DIMENSIONS = {
+    'user': {'user_id': F('user_id'), 'user_name': F('user__personal_identifier')},
+    'project': {'project_id': F('project_id'), 'project_name': F('project__name')},
+    'task': {'task_id': F('task_id'), 'task_title': F('task__title')},
+    'day': {'day': F('day')},
+    'week': {'week': TruncWeek('day')},
+    'month': {'month': TruncMonth('day')},
+}
+
+
+def team_rows(rollups, group_by):
+    """Itère sur les totaux des rollups regroupés par ``group_by`` (voir TEAM_DIMENSIONS).
+
+    Sans dimension, renvoie une seule ligne de total.
+    """
+    if not group_by:
+        totals = rollups.aggregate(minutes=Sum('minutes'), entries=Sum('entry_count'))
+        return iter([{'minutes': totals['minutes'] or 0, 'entries': totals['entries'] or 0}])
+    columns = {}
+    for dimension in group_by:
+        columns.update(TEAM_DIMENSIONS[dimension])
+    # Les alias ne doivent pas masquer les champs du modèle : on sélectionne ces derniers par leur nom
+    fields = [name for name, expression in columns.items()
+              if isinstance(expression, F) and expression.name == name]
+    expressions = {name: expression for name, expression in columns.items() if name not in fields}
+    return (
+        rollups.order_by()
+        .values(*fields, **expressions)
+        .annotate(minutes=Sum('minutes'), entries=Sum('entry_count'))
+        .order_by(*columns)
+        .iterator(chunk_size=2000)
+    )
+
+
+def build_report(rows, start_date, end_date):
+    """Assemble le rapport (résumé, par projet, par tâche, par jour) à partir des lignes groupées.
+
+    ``rows`` contient au plus une ligne par (tâche, jour) : le travail restant
+    en Python est proportionnel à ce nombre, pas au nombre d'entrées.
+    """
+    by_day = {}
+    day = start_date
+    while day <= end_date:
+        by_day[day.isoformat()] = 0
+        day += timedelta(days=1)
+
+    by_project, by_task = {}, {}
+    total_minutes = total_entries = 0
+    for row in rows:
+        minutes, entries = row['minutes'] or 0, row['entries']
+        total_minutes += minutes
+        total_entries += entries
+        by_day[row['day'].isoformat()] = by_day.get(row['day'].isoformat(), 0) + minutes
+
+        project = by_project.setdefault(row['project_id'], {
+            'task__project__name': row['project_name'],
+            'task__project__id': row['project_id'],
+            'total_minutes': 0,
+            'entry_count': 0,
+        })
+        project['total_minutes'] += minutes
+        project['entry_count'] += entries
+
+        task = by_task.setdefault(row['task_id'], {
+            'task__title': row['task_title'],
+            'task__id': row['task_id'],
+            'task__project__name': row['project_name'],
+            'total_minutes': 0,
+            'entry_count': 0,
+        })
+        task['total_minutes'] += minutes
+        task['entry_count'] += entries
+
+    return {
+        'period': {
+            'start_date': start_date,
+            'end_date': end_date
+        },
+        'summary': {
+            'total_minutes': total_minutes,
+            'total_hours': round(total_minutes / 60, 2),
+            'total_entries': total_entries,
+            'avg_per_day': round(total_minutes / max(1, (end_date - start_date).days + 1), 1)
+        },
+        'by_project': sorted(by_project.values(), key=lambda p: (-p['total_minutes'], p['task__project__id'])),
+        'by_task': sorted(by_task.values(), key=lambda t: (-t['total_minutes'], t['task__id'])),
+        'by_day': by_day
+    }
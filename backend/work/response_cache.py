@@ -0,0 +1,126 @@
+"""Cache par utilisateur des lectures fréquentes, invalidé par versions.
+
+Une valeur est rangée sous une clé formée du nom de la vue, de l'utilisateur,
+des paramètres de requête normalisés (triés), du jour local (les périodes par
+défaut en dépendent) et de la version de chaque portée dont elle dépend
+(``events:<user>``, ``timer:<user>``…). Les signaux font avancer ces versions
+après commit : les anciennes clés ne sont plus lues et expirent d'elles-mêmes.
+
+Les compteurs hits / misses par vue sont tenus dans le cache (``stats()``,
+exposés par ``/api/cache-stats/``).
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.response import Response
+
+VERSION_KEY = 'response-cache:version:%s'
+VALUE_KEY = 'response-cache:value:%s:%s'
+COUNTER_KEY = 'response-cache:%s:%s'
+
+# Noms des vues mises en cache, pour stats()
+NAMES = set()
+_MISSING = object()
+
+
+def versions(scopes):
+    keys = {scope: VERSION_KEY % scope for scope in scopes}
+    found = cache.get_many(keys.values())
+    for scope, key in keys.items():
+        if key not in found:
+            # Version perdue (éviction, redémarrage) : en repartir d'une inédite
+            cache.add(key, time.time_ns(), None)
+            found[key] = cache.get(key)
+    return [found[keys[scope]] for scope in scopes]
+
+
+def version(scope):
+    return versions([scope])[0]
+
+
+def bump(*scopes):
+    """Invalide les valeurs dépendant de ``scopes``, une fois la transaction validée"""
+    if scopes:
+        # Après commit : sinon un autre worker pourrait recacher l'ancien état sous la nouvelle version
+        transaction.on_commit(lambda: cache.set_many({VERSION_KEY % scope: time.time_ns() for scope in scopes}, None))
+
+
+def user_scopes(user_ids, *names):
+    return [f'{name}:{user_id}' for user_id in set(user_ids) for name in names]
+
+
+def for_user(*names):
+    """Portées ``<name>:<utilisateur courant>``, pour ``cache_response``"""
+    return lambda request: user_scopes([request.user.pk], *names)
+
+
+def _count(kind, name):
+    key = COUNTER_KEY % (kind, name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def _key(name, request, scopes, extra):
+    params = sorted((key, sorted(request.query_params.getlist(key))) for key in request.query_params)
+    digest = hashlib.sha1(repr((
+        request.user.pk, request.get_host(), params, extra, timezone.localdate().isoformat(), versions(scopes),
+    )).encode()).hexdigest()
+    return VALUE_KEY % (name, digest)
+
+
+def _lookup(name, key):
+    NAMES.add(name)
+    value = cache.get(key, _MISSING)
+    _count('misses' if value is _MISSING else 'hits', name)
+    return value
+
+
+def cached(name, request, scopes, compute, extra=()):
+    """Valeur de ``compute()`` pour cette requête, lue en cache si ses portées n'ont pas changé"""
+    key = _key(name, request, scopes, extra)
+    value = _lookup(name, key)
+    if value is _MISSING:
+        value = compute()
+        cache.set(key, value, settings.RESPONSE_CACHE_TIMEOUT)
+    return value
+
+
+def cache_response(name, scopes):
+    """Décorateur de méthode de vue DRF : met en cache ``response.data`` des réponses 200.
+
+    ``scopes(request)`` renvoie les portées dont dépend la réponse.
+    """
+    NAMES.add(name)
+
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            key = _key(name, request, scopes(request), sorted(kwargs.items()))
+            data = _lookup(name, key)
+            if data is not _MISSING:
+                return Response(data)
+            response = method(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+            return response
+        return wrapper
+    return decorator
+
+
+def stats():
+    keys = [COUNTER_KEY % (kind, name) for name in NAMES for kind in ('hits', 'misses')]
+    counters = cache.get_many(keys)
+    result = {}
+    for name in sorted(NAMES):
+        hits = counters.get(COUNTER_KEY % ('hits', name), 0)
+        misses = counters.get(COUNTER_KEY % ('misses', name), 0)
+        result[name] = {'hits': hits, 'misses': misses, 'hit_ratio': round(hits / (hits + misses), 3) if hits + misses else None}
+    return result
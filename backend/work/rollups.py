@@ -0,0 +1,53 @@
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import DailyTimeRollup, TimeEntry
+from .reports import entry_rows
+
+
+def entry_key(entry):
+    """Clé de rollup d'une entrée : (user_id, task_id, jour local)"""
+    return (entry.user_id, entry.task_id, timezone.localdate(entry.started_at))
+
+
+def apply_delta(key, minutes, count, project_id=None):
+    """Ajoute ``minutes`` / ``count`` (éventuellement négatifs) à la ligne de rollup ``key``"""
+    user_id, task_id, day = key
+    rows = DailyTimeRollup.objects.filter(user_id=user_id, task_id=task_id, day=day)
+    if rows.update(minutes=F('minutes') + minutes, entry_count=F('entry_count') + count):
+        if count < 0:
+            rows.filter(entry_count__lte=0).delete()
+        return
+    if count <= 0:
+        # Ligne déjà supprimée (cascade depuis la tâche) : rien à retirer
+        return
+    try:
+        with transaction.atomic():
+            DailyTimeRollup.objects.create(
+                user_id=user_id, task_id=task_id, day=day, project_id=project_id,
+                minutes=minutes, entry_count=count,
+            )
+    except IntegrityError:
+        # Créée entre-temps par une requête concurrente
+        rows.update(minutes=F('minutes') + minutes, entry_count=F('entry_count') + count)
+
+
+def rebuild(user=None):
+    """Recalcule entièrement les rollups (de tous les utilisateurs ou d'un seul)"""
+    entries = TimeEntry.objects.all()
+    rollups = DailyTimeRollup.objects.all()
+    if user is not None:
+        entries = entries.filter(user=user)
+        rollups = rollups.filter(user=user)
+    rows = entry_rows(entries, 'user_id').iterator(chunk_size=2000)
+    with transaction.atomic():
+        rollups.delete()
+        while batch := list(islice(rows, 1000)):
+            DailyTimeRollup.objects.bulk_create(
+                DailyTimeRollup(user_id=row['user_id'], task_id=row['task_id'], project_id=row['project_id'],
+                                day=row['day'], minutes=row['minutes'] or 0, entry_count=row['entries'])
+                for row in batch
+            )
@@ -0,0 +1,247 @@
+"""Recherche plein texte sur les projets, tâches, docs, commentaires et événements.
+
+Les textes indexés sont recopiés dans ``SearchEntry`` (une ligne par objet),
+tenue à jour par les signaux. Les entrées privées (événements) portent leur
+propriétaire dans ``user`` ; les autres sont visibles de tous les
+utilisateurs connectés. L'index lui-même dépend du moteur :
+
+- PostgreSQL : colonne ``vector`` (tsvector générée, titre pondéré ``A``)
+  avec un index GIN, classement ``ts_rank`` et extraits ``ts_headline`` ;
+- SQLite : table virtuelle FTS5 à contenu externe, synchronisée par
+  triggers, classement ``bm25`` et extraits ``snippet``.
+
+La colonne, la table virtuelle et les triggers sont créés par la migration
+``0009_search_entry`` (SQL figé) ; ce module n'en porte que les requêtes, et
+les vues ne manipulent que ``search()`` et ses ``Hit``.
+"""
+import re
+from collections import defaultdict, namedtuple
+from datetime import datetime
+
+from django.apps import apps as global_apps
+from django.db import connection
+from django.utils import timezone
+from django.utils.html import escape
+
+# type -> (modèle, champ titre, champ corps, propriétaire) ; un champ vide n'est pas
+# indexé, un propriétaire vide rend l'entrée visible de tous
+SOURCES = {
+    'project': ('Project', 'name', 'description', ''),
+    'task': ('Task', 'title', 'description', ''),
+    'doc': ('Doc', 'title', 'content', ''),
+    'comment': ('Comment', '', 'content', ''),
+    'event': ('Event', 'title', 'description', 'user_id'),
+}
+# Champs décrivant chaque résultat de la recherche unifiée, par type
+SUMMARY_FIELDS = {
+    'project': {'title': 'name', 'status': 'status'},
+    'task': {'title': 'title', 'project': 'project_id', 'status': 'status'},
+    'doc': {'title': 'title', 'category': 'category'},
+    'comment': {'title': 'task__title', 'task': 'task_id', 'project': 'task__project_id'},
+    'event': {'title': 'title', 'start': 'start_datetime', 'project': 'project_id', 'task': 'task_id'},
+}
+TABLE = 'work_searchentry'
+FTS_TABLE = 'work_searchentry_fts'
+MAX_TERMS = 16
+SNIPPET_WORDS = 16
+# Marqueurs de surlignage internes, remplacés après échappement HTML
+_MARK_START, _MARK_END = '\ue000', '\ue001'
+
+Hit = namedtuple('Hit', 'kind object_id score snippet')
+
+
+def kind_for(model):
+    for kind, (name, *_) in SOURCES.items():
+        if model._meta.app_label == 'work' and model.__name__ == name:
+            return kind
+    return None
+
+
+def indexed_fields(kind):
+    """Champs dont la modification impose de réindexer (``user_id`` -> ``user``)"""
+    return {field.removesuffix('_id') for field in SOURCES[kind][1:] if field}
+
+
+def document(kind, instance):
+    """Titre, corps et propriétaire indexés d'un objet"""
+    _, title_field, body_field, owner_field = SOURCES[kind]
+    title = getattr(instance, title_field) if title_field else ''
+    owner = getattr(instance, owner_field) if owner_field else None
+    return title or '', getattr(instance, body_field) or '', owner
+
+
+def index(instance):
+    """Crée ou met à jour l'entrée d'index d'un objet"""
+    from .models import SearchEntry
+
+    kind = kind_for(type(instance))
+    title, body, owner = document(kind, instance)
+    SearchEntry.objects.update_or_create(
+        kind=kind, object_id=instance.pk, defaults={'title': title, 'body': body, 'user_id': owner}
+    )
+
+
+def unindex(model, pks):
+    from .models import SearchEntry
+
+    return SearchEntry.objects.filter(kind=kind_for(model), object_id__in=pks).delete()[0]
+
+
+def rebuild(batch_size=1000):
+    """Reconstruit l'index complet (commande ``rebuild_search_index``)"""
+    from .models import SearchEntry
+
+    SearchEntry.objects.all().delete()
+    total = 0
+    for kind, (name, title_field, body_field, owner_field) in SOURCES.items():
+        fields = ['pk'] + [f for f in (title_field, body_field, owner_field) if f]
+        rows = global_apps.get_model('work', name).objects.order_by('pk').values_list(*fields)
+        batch = []
+        for row in rows.iterator(chunk_size=batch_size):
+            values = dict(zip(fields, row))
+            batch.append(SearchEntry(
+                kind=kind, object_id=values['pk'],
+                title=values.get(title_field) or '', body=values.get(body_field) or '',
+                user_id=values.get(owner_field),
+            ))
+            if len(batch) >= batch_size:
+                total += len(SearchEntry.objects.bulk_create(batch))
+                batch = []
+        total += len(SearchEntry.objects.bulk_create(batch))
+    return total
+
+
+# --- Requêtes ---
+
+def terms(query):
+    return re.findall(r'\w+', query or '')[:MAX_TERMS]
+
+
+def highlight(text):
+    """Échappe l'extrait et remplace les marqueurs internes par ``<mark>``"""
+    return escape(text or '').replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>')
+
+
+class SearchResults:
+    """Résultats classés d'une recherche, évalués paresseusement par tranches.
+
+    Se comporte comme une séquence (``count()``, ``len()``, découpage) pour
+    être paginée comme un queryset : chaque tranche est une requête
+    ``LIMIT/OFFSET`` et seuls les extraits de la page sont calculés.
+    ``within`` restreint chaque type aux objets d'un queryset
+    (``{'task': queryset}``) ; les types absents de ``within`` sont ignorés
+    si ``within`` est fourni. ``user`` exclut les entrées privées des autres.
+    """
+
+    def __init__(self, query, kinds=None, within=None, user=None):
+        self.terms = terms(query)
+        self.kinds = list(within) if within is not None else list(kinds or SOURCES)
+        self.within = within or {}
+        self.user = user
+        self._count = None
+
+    def _where(self):
+        where, params = self._kinds_where()
+        if self.user is not None:
+            where = f'({where}) AND (e.user_id IS NULL OR e.user_id = %s)'
+            params.append(self.user.pk)
+        return where, params
+
+    def _kinds_where(self):
+        clauses, params = [], []
+        for kind in self.kinds:
+            clause, clause_params = 'e.kind = %s', [kind]
+            if kind in self.within:
+                sql, sub_params = self.within[kind].order_by().values('pk').query.sql_with_params()
+                clause += f' AND e.object_id IN ({sql})'
+                clause_params += list(sub_params)
+            clauses.append(f'({clause})')
+            params += clause_params
+        return ' OR '.join(clauses) or '1 = 0', params
+
+    def _match(self):
+        if connection.vendor == 'postgresql':
+            return ' & '.join(f'{term}:*' for term in self.terms)
+        return ' '.join('"%s"*' % term for term in self.terms)
+
+    def count(self):
+        if self._count is None:
+            if not self.terms:
+                self._count = 0
+            else:
+                where, params = self._where()
+                if connection.vendor == 'postgresql':
+                    sql = (f"SELECT count(*) FROM {TABLE} e "
+                           f"WHERE e.vector @@ to_tsquery('french', %s) AND ({where})")
+                else:
+                    sql = (f"SELECT count(*) FROM {FTS_TABLE} JOIN {TABLE} e ON e.id = {FTS_TABLE}.rowid "
+                           f"WHERE {FTS_TABLE} MATCH %s AND ({where})")
+                with connection.cursor() as cursor:
+                    cursor.execute(sql, [self._match()] + params)
+                    self._count = cursor.fetchone()[0]
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            return self[item:item + 1][0]
+        start, stop = item.start or 0, item.stop
+        if not self.terms or (stop is not None and stop <= start):
+            return []
+        limit = stop - start if stop is not None else -1
+        where, params = self._where()
+        match = self._match()
+        if connection.vendor == 'postgresql':
+            options = f'StartSel={_MARK_START}, StopSel={_MARK_END}, MaxWords={SNIPPET_WORDS}, MinWords=5'
+            sql = (
+                "SELECT p.kind, p.object_id, p.score, ts_headline('french', "
+                "CASE WHEN p.body = '' THEN p.title ELSE p.body END, to_tsquery('french', %s), %s) "
+                "FROM (SELECT e.id, e.kind, e.object_id, e.title, e.body, "
+                "ts_rank(e.vector, to_tsquery('french', %s)) AS score "
+                f"FROM {TABLE} e WHERE e.vector @@ to_tsquery('french', %s) AND ({where}) "
+                "ORDER BY score DESC, e.id DESC LIMIT %s OFFSET %s) p "
+                "ORDER BY p.score DESC, p.id DESC"
+            )
+            params = [match, options, match, match] + params + [limit if limit >= 0 else None, start]
+        else:
+            sql = (
+                # bm25 renvoie un score négatif (meilleur = plus petit) ; titre pondéré x10
+                f"SELECT e.kind, e.object_id, -bm25({FTS_TABLE}, 10.0, 1.0) AS score, "
+                f"snippet({FTS_TABLE}, -1, %s, %s, '…', {SNIPPET_WORDS}) "
+                f"FROM {FTS_TABLE} JOIN {TABLE} e ON e.id = {FTS_TABLE}.rowid "
+                f"WHERE {FTS_TABLE} MATCH %s AND ({where}) "
+                "ORDER BY score DESC, e.id DESC LIMIT %s OFFSET %s"
+            )
+            params = [_MARK_START, _MARK_END, match] + params + [limit, start]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [Hit(kind, object_id, round(score, 6), highlight(snippet))
+                    for kind, object_id, score, snippet in cursor.fetchall()]
+
+
+def search(query, kinds=None, within=None, user=None):
+    return SearchResults(query, kinds=kinds, within=within, user=user)
+
+
+def describe(hits):
+    """Résultats typés prêts à sérialiser : une requête par type présent dans la page.
+
+    Les entrées dont l'objet a disparu entre-temps sont ignorées.
+    """
+    ids = defaultdict(list)
+    for hit in hits:
+        ids[hit.kind].append(hit.object_id)
+    rows = {}
+    for kind, pks in ids.items():
+        keys, fields = zip(*SUMMARY_FIELDS[kind].items())
+        model = global_apps.get_model('work', SOURCES[kind][0])
+        for pk, *values in model.objects.filter(pk__in=pks).values_list('pk', *fields):
+            values = [timezone.localtime(v) if isinstance(v, datetime) else v for v in values]
+            rows[kind, pk] = dict(zip(keys, values))
+    return [
+        {'type': hit.kind, 'id': hit.object_id, **rows[hit.kind, hit.object_id],
+         'score': hit.score, 'snippet': hit.snippet}
+        for hit in hits if (hit.kind, hit.object_id) in rows
+    ]
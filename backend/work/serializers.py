@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from users.models import User
-from .models import Project, Task, SubTask, Comment, Attachment, Doc, TimeEntry, ClientView, Event, Schedule, Timer
+from . import project_stats, recurrence
+from .models import Project, Task, SubTask, Comment, Attachment, Doc, TimeEntry, ClientView, Event, EventException, Schedule, Timer
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -30,6 +31,8 @@ class CommentSerializer(serializers.ModelSerializer):
         fields = ["id", "content", "created_at", "author", "task"]
 
 class TaskSerializer(serializers.ModelSerializer):
+    NESTED_FIELDS = ("subtasks", "comments", "attachments")
+
     assignee = UserSerializer(read_only=True)
     subtasks = SubTaskSerializer(many=True, read_only=True)
     comments = CommentSerializer(many=True, read_only=True)
@@ -39,15 +42,114 @@ class TaskSerializer(serializers.ModelSerializer):
         model = Task
         fields = [
             "id", "project", "title", "description", "assignee", "status", "priority",
-            "due_date", "tags", "created_at", "updated_at", "subtasks", "comments", "attachments"
+            "due_date", "tags", "rank", "created_at", "updated_at", "subtasks", "comments", "attachments"
         ]
+        # Le rang se modifie via l'action ``move``
+        read_only_fields = ["rank"]
+
+    def __init__(self, *args, omit=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        # Permet d'exclure les collections imbriquées non demandées (voir ProjectSerializer)
+        for name in omit:
+            self.fields.pop(name, None)
+
+class TaskListSerializer(serializers.ModelSerializer):
+    """Représentation compacte pour les listes (kanban) : compteurs au lieu des collections"""
+    assignee = UserSerializer(read_only=True)
+    subtask_count = serializers.IntegerField(read_only=True)
+    subtask_done_count = serializers.IntegerField(read_only=True)
+    comment_count = serializers.IntegerField(read_only=True)
+    attachment_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Task
+        fields = [
+            "id", "project", "title", "description", "assignee", "status", "priority",
+            "due_date", "tags", "rank", "created_at", "updated_at",
+            "subtask_count", "subtask_done_count", "comment_count", "attachment_count"
+        ]
+
+class TaskBulkSerializer(serializers.Serializer):
+    """Opération groupée sur des tâches : champs à modifier, tags à ajouter/retirer, ou suppression"""
+    MAX_IDS = 500
+
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=MAX_IDS)
+    status = serializers.ChoiceField(choices=Task.STATUS_CHOICES, required=False)
+    priority = serializers.ChoiceField(choices=Task.PRIORITY_CHOICES, required=False)
+    assignee = serializers.PrimaryKeyRelatedField(queryset=User.objects.all(), required=False, allow_null=True)
+    add_tags = serializers.ListField(child=serializers.CharField(max_length=50), required=False)
+    remove_tags = serializers.ListField(child=serializers.CharField(max_length=50), required=False)
+    delete = serializers.BooleanField(default=False)
+
+    def validate(self, attrs):
+        changes = set(attrs) - {'ids', 'delete'}
+        if attrs['delete'] and changes:
+            raise serializers.ValidationError("Une suppression ne peut pas être combinée à des modifications.")
+        if not attrs['delete'] and not changes:
+            raise serializers.ValidationError("Aucune modification demandée.")
+        attrs['ids'] = list(dict.fromkeys(attrs['ids']))
+        return attrs
+
+class ProjectListSerializer(serializers.ListSerializer):
+    """Calcule les statistiques de tous les projets de la liste en une fois"""
+
+    def to_representation(self, data):
+        projects = list(data.all() if hasattr(data, "all") else data)
+        self.context.setdefault("project_stats", {}).update(project_stats.stats_for(projects))
+        return super().to_representation(projects)
 
 class ProjectSerializer(serializers.ModelSerializer):
+    """Projet avec arbre de tâches optionnel et statistiques d'avancement (voir work.project_stats).
+
+    Le contexte ``expand`` (ensemble de chemins comme ``tasks`` ou
+    ``tasks.comments``) limite les relations sérialisées ; sans lui,
+    l'arbre complet est renvoyé.
+    """
+    EXPANSIONS = ("tasks",) + tuple(f"tasks.{name}" for name in TaskSerializer.NESTED_FIELDS)
+
     tasks = TaskSerializer(many=True, read_only=True)
+    task_counts_by_status = serializers.SerializerMethodField()
+    overdue_count = serializers.SerializerMethodField()
+    logged_minutes = serializers.SerializerMethodField()
+    next_deadline = serializers.SerializerMethodField()
 
     class Meta:
         model = Project
-        fields = ["id", "name", "description", "client", "deadline", "status", "category", "created_at", "updated_at", "tasks"]
+        list_serializer_class = ProjectListSerializer
+        fields = [
+            "id", "name", "description", "client", "deadline", "status", "category", "created_at", "updated_at",
+            "task_counts_by_status", "overdue_count", "logged_minutes", "next_deadline", "tasks",
+        ]
+
+    def _stats(self, project):
+        stats = self.context.setdefault("project_stats", {})
+        if project.pk not in stats:
+            stats.update(project_stats.stats_for([project]))
+        return stats[project.pk]
+
+    def get_task_counts_by_status(self, project):
+        return self._stats(project)["task_counts_by_status"]
+
+    def get_overdue_count(self, project):
+        return self._stats(project)["overdue_count"]
+
+    def get_logged_minutes(self, project):
+        return self._stats(project)["logged_minutes"]
+
+    def get_next_deadline(self, project):
+        return self._stats(project)["next_deadline"]
+
+    def get_fields(self):
+        fields = super().get_fields()
+        expand = self.context.get("expand")
+        if expand is None:
+            return fields
+        if "tasks" not in expand:
+            fields.pop("tasks")
+        else:
+            omit = [name for name in TaskSerializer.NESTED_FIELDS if f"tasks.{name}" not in expand]
+            fields["tasks"] = TaskSerializer(many=True, read_only=True, omit=omit)
+        return fields
 
 class DocSerializer(serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
@@ -85,6 +187,68 @@ class EventSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['user', 'created_at', 'updated_at']
 
+    def validate(self, attrs):
+        def value(name):
+            return attrs.get(name, getattr(self.instance, name, None))
+
+        if value('is_recurring') and value('recurrence_rule'):
+            error = recurrence.validate_rule(value('recurrence_rule'), value('start_datetime'))
+            if error:
+                raise serializers.ValidationError({'recurrence_rule': error})
+        return attrs
+
+class EventCalendarSerializer(serializers.ModelSerializer):
+    """Représentation compacte pour les vues mois/semaine ; ``include`` ajoute des champs optionnels"""
+    OPTIONAL_FIELDS = (
+        "description", "location", "duration_minutes", "project_name", "task_title", "created_at", "updated_at"
+    )
+
+    duration_minutes = serializers.ReadOnlyField()
+    project_name = serializers.CharField(source='project.name', read_only=True)
+    task_title = serializers.CharField(source='task.title', read_only=True)
+
+    class Meta:
+        model = Event
+        fields = [
+            'id', 'title', 'event_type', 'start_datetime', 'end_datetime', 'all_day', 'color',
+            'project', 'task', 'is_recurring', 'description', 'location', 'duration_minutes',
+            'project_name', 'task_title', 'created_at', 'updated_at'
+        ]
+        read_only_fields = fields
+
+    def __init__(self, *args, include=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        for name in self.OPTIONAL_FIELDS:
+            if name not in include:
+                self.fields.pop(name)
+
+class EventExceptionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = EventException
+        fields = [
+            'id', 'event', 'occurrence_start', 'is_cancelled', 'start_datetime', 'end_datetime',
+            'title', 'created_at'
+        ]
+        read_only_fields = ['created_at']
+
+    def validate_event(self, event):
+        if event.user_id != self.context['request'].user.pk:
+            raise serializers.ValidationError("Événement introuvable.")
+        if not (event.is_recurring and event.recurrence_rule):
+            raise serializers.ValidationError("L'événement n'est pas récurrent.")
+        return event
+
+    def validate(self, attrs):
+        event = attrs.get('event', getattr(self.instance, 'event', None))
+        occurrence = attrs.get('occurrence_start', getattr(self.instance, 'occurrence_start', None))
+        try:
+            rule = recurrence.parse_rule(event.recurrence_rule, event.start_datetime, after=occurrence)
+        except (ValueError, TypeError):
+            raise serializers.ValidationError({'event': "Règle de récurrence invalide."})
+        if not rule.includes(occurrence):
+            raise serializers.ValidationError({'occurrence_start': "Aucune occurrence à cette date."})
+        return attrs
+
 class ScheduleSerializer(serializers.ModelSerializer):
     day_of_week_display = serializers.CharField(source='get_day_of_week_display', read_only=True)
     
@@ -0,0 +1,198 @@
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import live, project_stats, response_cache, rollups, search, sync, tagging
+from .agenda import bump_schedules_version
+from .models import Attachment, Comment, DailyTimeRollup, Doc, Event, EventException, Project, Schedule, SubTask, Task, TimeEntry, Timer
+
+
+@receiver(pre_save, sender=TimeEntry)
+def remember_rollup_state(sender, instance, **kwargs):
+    """Mémorise la clé et la durée avant modification pour corriger l'ancien rollup"""
+    instance._rollup_previous = None
+    if instance.pk:
+        previous = TimeEntry.objects.filter(pk=instance.pk).only(
+            'user_id', 'task_id', 'started_at', 'duration_minutes'
+        ).first()
+        if previous is not None:
+            instance._rollup_previous = (rollups.entry_key(previous), previous.duration_minutes)
+
+
+@receiver(post_save, sender=TimeEntry)
+def update_rollup_on_save(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_rollup_previous', None)
+    key = rollups.entry_key(instance)
+    if previous is not None:
+        previous_key, previous_minutes = previous
+        if previous_key == key:
+            rollups.apply_delta(key, instance.duration_minutes - previous_minutes, 0)
+            return
+        rollups.apply_delta(previous_key, -previous_minutes, -1)
+    rollups.apply_delta(key, instance.duration_minutes, 1, project_id=instance.task.project_id)
+
+
+@receiver(post_delete, sender=TimeEntry)
+def update_rollup_on_delete(sender, instance, **kwargs):
+    rollups.apply_delta(rollups.entry_key(instance), -instance.duration_minutes, -1)
+
+
+@receiver(post_save, sender=Task)
+def move_rollups_with_task(sender, instance, created, update_fields=None, **kwargs):
+    """Le projet est dénormalisé dans les rollups : le suivre si la tâche change de projet"""
+    if created or (update_fields is not None and 'project' not in update_fields):
+        return
+    DailyTimeRollup.objects.filter(task=instance).exclude(project_id=instance.project_id).update(
+        project_id=instance.project_id
+    )
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=Task)
+@receiver(post_save, sender=Doc)
+@receiver(post_save, sender=Comment)
+@receiver(post_save, sender=Event)
+def update_search_entry(sender, instance, update_fields=None, **kwargs):
+    """Réindexe l'objet sauf si la sauvegarde ne touche aucun champ texte indexé"""
+    if update_fields is not None and not search.indexed_fields(search.kind_for(sender)) & set(update_fields):
+        return
+    search.index(instance)
+
+
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=Task)
+@receiver(post_delete, sender=Doc)
+@receiver(post_delete, sender=Comment)
+@receiver(post_delete, sender=Event)
+def delete_search_entry(sender, instance, **kwargs):
+    search.unindex(sender, [instance.pk])
+
+
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=Task)
+@receiver(post_delete, sender=Doc)
+@receiver(post_delete, sender=Event)
+@receiver(post_delete, sender=SubTask)
+@receiver(post_delete, sender=Comment)
+@receiver(post_delete, sender=Attachment)
+def record_tombstone(sender, instance, **kwargs):
+    sync.record(instance)
+
+
+@receiver(pre_delete, sender=Project)
+@receiver(pre_delete, sender=Task)
+def touch_events_of_deleted(sender, instance, **kwargs):
+    """Les événements liés passent à NULL sans changer updated_at : les signaler à la synchronisation"""
+    Event.objects.filter(**{sender._meta.model_name: instance}).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Task)
+def sync_task_tags(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and 'tags' not in update_fields:
+        return
+    if created and not instance.tags:
+        return
+    tagging.sync([instance])
+
+
+@receiver(post_save, sender=EventException)
+@receiver(post_delete, sender=EventException)
+def touch_event_on_exception_change(sender, instance, **kwargs):
+    """Le cache des occurrences est indexé par Event.updated_at : le faire avancer"""
+    Event.objects.filter(pk=instance.event_id).update(updated_at=timezone.now())
+    live.publish([f'user:{instance.event.user_id}'], 'event.updated', id=instance.event_id)
+
+
+@receiver(post_save, sender=Schedule)
+@receiver(post_delete, sender=Schedule)
+def invalidate_schedule_weeks(sender, instance, **kwargs):
+    bump_schedules_version(instance.user_id)
+
+
+@receiver(post_save, sender=Task)
+def publish_task_saved(sender, instance, created, **kwargs):
+    live.task_saved(instance, created)
+
+
+@receiver(post_delete, sender=Task)
+def publish_task_deleted(sender, instance, **kwargs):
+    live.publish([f'project:{instance.project_id}'], 'task.deleted', id=instance.pk, project=instance.project_id)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def publish_comment(sender, instance, created=None, **kwargs):
+    try:
+        project_id = instance.task.project_id
+    except Task.DoesNotExist:
+        return
+    action = 'deleted' if created is None else 'created' if created else 'updated'
+    live.publish([f'project:{project_id}'], f'comment.{action}', id=instance.pk, task=instance.task_id, project=project_id)
+
+
+@receiver(post_save, sender=Timer)
+@receiver(post_delete, sender=Timer)
+def publish_timer(sender, instance, created=None, **kwargs):
+    action = 'stopped' if created is None else 'started' if created else 'updated'
+    live.publish([f'user:{instance.user_id}'], f'timer.{action}', id=instance.pk, task=instance.task_id)
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def publish_event(sender, instance, created=None, **kwargs):
+    action = 'deleted' if created is None else 'created' if created else 'updated'
+    live.publish([f'user:{instance.user_id}'], f'event.{action}', id=instance.pk)
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_event_responses(sender, instance, **kwargs):
+    response_cache.bump(f'events:{instance.user_id}')
+
+
+@receiver(post_save, sender=EventException)
+@receiver(post_delete, sender=EventException)
+def invalidate_event_responses_on_exception(sender, instance, **kwargs):
+    response_cache.bump(f'events:{instance.event.user_id}')
+
+
+@receiver(post_save, sender=Timer)
+@receiver(post_delete, sender=Timer)
+def invalidate_timer_response(sender, instance, **kwargs):
+    response_cache.bump(f'timer:{instance.user_id}')
+
+
+@receiver(post_save, sender=TimeEntry)
+@receiver(post_delete, sender=TimeEntry)
+def invalidate_report_responses(sender, instance, **kwargs):
+    response_cache.bump(f'reports:{instance.user_id}')
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=Task)
+@receiver(pre_delete, sender=Project)
+@receiver(pre_delete, sender=Task)
+def invalidate_responses_naming(sender, instance, created=False, update_fields=None, **kwargs):
+    """Événements, timers et rapports affichent le nom du projet / de la tâche : invalider leurs utilisateurs"""
+    if created or (update_fields is not None and not {'name', 'title', 'project'} & set(update_fields)):
+        return
+    field = sender._meta.model_name
+    timers = Timer.objects.filter(**{'task__project' if sender is Project else 'task': instance})
+    response_cache.bump(
+        *response_cache.user_scopes(Event.objects.filter(**{field: instance}).values_list('user_id', flat=True), 'events'),
+        *response_cache.user_scopes(DailyTimeRollup.objects.filter(**{field: instance}).values_list('user_id', flat=True), 'reports'),
+        *response_cache.user_scopes(timers.values_list('user_id', flat=True), 'timer'),
+    )
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def invalidate_project_stats_on_task_change(sender, instance, **kwargs):
+    """Statistiques du projet de la tâche (et de l'ancien, si elle a changé de projet) à recalculer"""
+    project_stats.invalidate({instance.project_id, getattr(instance, '_loaded_project_id', None)})
+
+
+@receiver(post_save, sender=TimeEntry)
+@receiver(post_delete, sender=TimeEntry)
+def invalidate_project_stats_on_time_change(sender, instance, **kwargs):
+    project_stats.invalidate(Task.objects.filter(pk=instance.task_id).values_list('project_id', flat=True))
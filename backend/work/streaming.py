@@ -0,0 +1,75 @@
+import csv
+from datetime import date, datetime, time
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+FLUSH_EVERY = 500
+
+
+def json_object(head, sections):
+    """Génère un document JSON ``{...head, key1: [...], key2: [...]}`` morceau par morceau.
+
+    ``sections`` est une suite de couples (clé, lignes) ; les lignes sont encodées
+    au fil de l'itération et regroupées par paquets de ``FLUSH_EVERY`` : la mémoire
+    reste constante quelle que soit la taille.
+    """
+    encoder = DjangoJSONEncoder()
+    separator = ', ' if head else ''
+    yield encoder.encode(head)[:-1]
+    for key, rows in sections:
+        yield separator + encoder.encode(key) + ': ['
+        separator = ', '
+        buffer = []
+        for index, row in enumerate(rows):
+            buffer.append((', ' if index else '') + encoder.encode(row))
+            if len(buffer) >= FLUSH_EVERY:
+                yield ''.join(buffer)
+                buffer = []
+        yield ''.join(buffer) + ']'
+    yield '}'
+
+
+def json_document(head, key, rows):
+    """Document JSON ``{...head, key: [rows...]}`` (voir ``json_object``)"""
+    return json_object(head, [(key, rows)])
+
+
+def ndjson_lines(rows):
+    """Une ligne JSON par élément (NDJSON), par paquets de ``FLUSH_EVERY``"""
+    encoder = DjangoJSONEncoder()
+    buffer = []
+    for row in rows:
+        buffer.append(encoder.encode(row) + '\n')
+        if len(buffer) >= FLUSH_EVERY:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+class _Echo:
+    """Pseudo-fichier pour csv.writer : ``write`` renvoie la ligne au lieu de la stocker"""
+
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if isinstance(value, (datetime, date, time)):
+        # Même représentation que les exports JSON / NDJSON (ISO 8601, millisecondes, UTC en ``Z``)
+        return DjangoJSONEncoder().default(value)
+    return '' if value is None else value
+
+
+def csv_lines(columns, rows):
+    """En-tête puis une ligne CSV par dictionnaire de ``rows`` (colonnes ``columns``)"""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    buffer = []
+    for row in rows:
+        buffer.append(writer.writerow([_csv_value(row[column]) for column in columns]))
+        if len(buffer) >= FLUSH_EVERY:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
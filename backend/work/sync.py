@@ -0,0 +1,178 @@
+"""Synchronisation incrémentale (``/api/sync/?since=``) des projets, tâches, événements et docs.
+
+Le curseur est l'instant de la réponse précédente (entier en microsecondes,
+opaque pour le client). Les lignes dont ``updated_at`` est postérieur sont
+renvoyées en entier ; les suppressions sous forme de tombstones (``Tombstone``,
+écrits par les signaux et par la purge). ``updated_at`` est posé avant le
+commit : une transaction longue peut rendre visible, après coup, une ligne
+datée d'avant le curseur. La requête recule donc de ``SYNC_CURSOR_OVERLAP``
+secondes et le client applique les changements de façon idempotente (par id).
+
+Les tombstones plus vieux que ``SYNC_TOMBSTONE_RETENTION_DAYS`` sont supprimés
+par ``manage.py prune_tombstones`` ; un curseur antérieur à cette limite
+entraîne une resynchronisation complète (``full``).
+
+Une synchronisation est découpée en pages d'au plus ``SYNC_PAGE_SIZE`` objets,
+parcourues type par type dans l'ordre (``updated_at``, ``id``) jusqu'à
+l'instant de la première page. Tant qu'il reste des pages, le curseur renvoyé
+est une position (``Position``) dans ce parcours ; sur la dernière page, c'est
+l'instant de la première.
+
+Les tâches sont servies avec le décompte de leurs enfants (sous-tâches,
+commentaires, pièces jointes) : une tâche est aussi renvoyée quand un enfant a
+été modifié (``updated_at`` de l'enfant) ou supprimé (tombstone portant
+``parent_id``) depuis le curseur, sans que sa propre ligne ne change.
+"""
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Attachment, Comment, Doc, Event, Project, SubTask, Task, Tombstone
+
+# type -> (modèle, champ propriétaire si les objets sont privés)
+SOURCES = {
+    'project': (Project, None),
+    'task': (Task, None),
+    'event': (Event, 'user_id'),
+    'doc': (Doc, None),
+}
+
+# Enfants des tâches : non synchronisés eux-mêmes, ils renvoient leur tâche
+TASK_CHILDREN = {
+    'subtask': SubTask,
+    'comment': Comment,
+    'attachment': Attachment,
+}
+
+
+def kind_for(model):
+    for kind, (source, _) in SOURCES.items():
+        if source is model:
+            return kind
+    for kind, source in TASK_CHILDREN.items():
+        if source is model:
+            return kind
+    return None
+
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+# Reprise d'une synchronisation en cours : instant de départ (``None`` si complète),
+# instant de la première page, type en cours et dernier objet servi de ce type
+Position = namedtuple('Position', 'since until kind updated_at id')
+
+
+def _micros(value):
+    # Arithmétique entière : un float perdrait des microsecondes et décalerait les bornes
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+def _instant(micros):
+    return EPOCH + timedelta(microseconds=int(micros))
+
+
+def encode_cursor(value):
+    """Curseur de fin de synchronisation : l'instant ``value``, ou une ``Position``"""
+    if isinstance(value, Position):
+        return ':'.join([
+            'p', str(_micros(value.since)) if value.since else '', str(_micros(value.until)), value.kind,
+            str(_micros(value.updated_at)) if value.updated_at else '', str(value.id or ''),
+        ])
+    return str(_micros(value))
+
+
+def decode_cursor(value):
+    """Instant ou ``Position`` désignés par un curseur ; ``ValueError`` s'il est illisible"""
+    if not value.startswith('p:'):
+        return _instant(value)
+    _, since, until, kind, updated_at, pk = value.split(':')
+    if kind not in SOURCES or bool(updated_at) != bool(pk):
+        raise ValueError(value)
+    return Position(
+        _instant(since) if since else None, _instant(until), kind,
+        _instant(updated_at) if updated_at else None, int(pk) if pk else None,
+    )
+
+
+def horizon(now=None):
+    """Plus ancien curseur encore servi en incrémental (les tombstones antérieurs sont purgés)"""
+    return (now or timezone.now()) - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+
+
+def changed(kind, user, since=None, until=None, after=None):
+    """Objets de ``kind`` visibles par ``user`` modifiés depuis ``since`` (tous si ``None``).
+
+    ``until`` : borne haute exclue ; ``after`` : ``(updated_at, id)`` du dernier
+    objet déjà servi, pour reprendre le parcours à l'objet suivant.
+    """
+    model, owner = SOURCES[kind]
+    qs = model.objects.all()
+    if owner:
+        qs = qs.filter(**{owner: user.pk})
+    if since is not None:
+        since -= timedelta(seconds=settings.SYNC_CURSOR_OVERLAP)
+        recent = Q(updated_at__gte=since)
+        if kind == 'task':
+            recent |= _children_changed(since)
+        qs = qs.filter(recent)
+    if until is not None:
+        qs = qs.filter(updated_at__lt=until)
+    if after is not None:
+        updated_at, pk = after
+        qs = qs.filter(Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, id__gt=pk))
+    return qs.order_by('updated_at', 'id')
+
+
+def _children_changed(since):
+    """Tâches dont un enfant a été modifié ou supprimé depuis ``since``"""
+    condition = Q(pk__in=Tombstone.objects.filter(
+        kind__in=TASK_CHILDREN, deleted_at__gte=since,
+    ).values('parent_id'))
+    for model in TASK_CHILDREN.values():
+        condition |= Q(pk__in=model.objects.filter(updated_at__gte=since).values('task_id'))
+    return condition
+
+
+def deleted(kinds, user, since):
+    """Identifiants supprimés depuis ``since``, par type"""
+    rows = Tombstone.objects.filter(
+        Q(user=None) | Q(user=user),
+        kind__in=kinds,
+        deleted_at__gte=since - timedelta(seconds=settings.SYNC_CURSOR_OVERLAP),
+    )
+    result = {kind: [] for kind in kinds}
+    for kind, object_id in rows.order_by('deleted_at', 'id').values_list('kind', 'object_id'):
+        result[kind].append(object_id)
+    return result
+
+
+def record(instance):
+    """Tombstone d'un objet supprimé (signal post_delete)"""
+    kind = kind_for(type(instance))
+    if kind in TASK_CHILDREN:
+        Tombstone.objects.create(kind=kind, object_id=instance.pk, parent_id=instance.task_id)
+        return
+    owner = SOURCES[kind][1]
+    Tombstone.objects.create(kind=kind, object_id=instance.pk, user_id=getattr(instance, owner) if owner else None)
+
+
+def record_bulk(queryset):
+    """Tombstones des objets de ``queryset`` avant un DELETE qui contourne les signaux"""
+    kind = kind_for(queryset.model)
+    if kind in TASK_CHILDREN:
+        rows = [Tombstone(kind=kind, object_id=pk, parent_id=task_id)
+                for pk, task_id in queryset.values_list('pk', 'task_id').iterator()]
+    else:
+        owner = SOURCES[kind][1]
+        fields = ('pk', owner) if owner else ('pk',)
+        rows = [Tombstone(kind=kind, object_id=row[0], user_id=row[1] if owner else None)
+                for row in queryset.values_list(*fields).iterator()]
+    return len(Tombstone.objects.bulk_create(rows, batch_size=1000))
+
+
+def prune(before=None):
+    """Supprime les tombstones antérieurs à l'horizon ; renvoie leur nombre"""
+    return Tombstone.objects.filter(deleted_at__lt=before or horizon()).delete()[0]
@@ -0,0 +1,79 @@
+"""Table ``TaskTag`` : une ligne par (tâche, tag), reflet normalisé de ``Task.tags``.
+
+Le JSON reste la source de vérité (API, exports) ; la table sert au filtrage
+et aux comptages par tag via l'index (tag, task), sans parser le JSON de
+chaque ligne. Elle est tenue à jour par le signal ``post_save`` de Task et,
+pour les écritures qui le contournent (``bulk_update``), par ``sync()``.
+"""
+from functools import reduce
+from operator import or_
+
+from django.apps import apps as global_apps
+from django.db.models import Count, Q
+
+MAX_LENGTH = 100
+
+
+def normalize(tags):
+    """Tags distincts, en chaînes non vides, dans leur ordre d'apparition"""
+    result = []
+    for tag in tags or []:
+        tag = str(tag).strip()[:MAX_LENGTH]
+        if tag and tag not in result:
+            result.append(tag)
+    return result
+
+
+def sync(tasks, apps=global_apps):
+    """Aligne les lignes TaskTag sur ``task.tags`` pour chaque tâche fournie"""
+    TaskTag = apps.get_model('work', 'TaskTag')
+    tasks = list(tasks)
+    if not tasks:
+        return
+    existing = set(TaskTag.objects.filter(task__in=[t.pk for t in tasks]).values_list('task_id', 'tag'))
+    wanted = {(task.pk, tag) for task in tasks for tag in normalize(task.tags)}
+    stale = existing - wanted
+    if stale:
+        TaskTag.objects.filter(reduce(or_, (Q(task_id=task_id, tag=tag) for task_id, tag in stale))).delete()
+    TaskTag.objects.bulk_create(
+        [TaskTag(task_id=task_id, tag=tag) for task_id, tag in wanted - existing],
+        batch_size=1000, ignore_conflicts=True,
+    )
+
+
+def rebuild(apps=global_apps, batch_size=1000):
+    """Reconstruit la table à partir de ``Task.tags`` (migration, commande ``rebuild_task_tags``)"""
+    Task = apps.get_model('work', 'Task')
+    TaskTag = apps.get_model('work', 'TaskTag')
+    TaskTag.objects.all().delete()
+    rows = []
+    for pk, tags in Task.objects.order_by('pk').values_list('pk', 'tags').iterator(chunk_size=batch_size):
+        rows += [TaskTag(task_id=pk, tag=tag) for tag in normalize(tags)]
+        if len(rows) >= batch_size:
+            TaskTag.objects.bulk_create(rows)
+            rows = []
+    TaskTag.objects.bulk_create(rows)
+    return TaskTag.objects.count()
+
+
+def filter_tasks(queryset, tags, match='any'):
+    """Restreint ``queryset`` aux tâches portant un des tags (``any``) ou tous (``all``)"""
+    from .models import TaskTag
+
+    tags = normalize(tags)
+    if not tags:
+        return queryset
+    rows = TaskTag.objects.filter(tag__in=tags).values('task')
+    if match == 'all':
+        rows = rows.annotate(matched=Count('tag')).filter(matched=len(tags)).values('task')
+    return queryset.filter(pk__in=rows)
+
+
+def counts(queryset):
+    """``[{'tag', 'count'}]`` sur les tâches de ``queryset``, du plus fréquent au plus rare"""
+    from .models import TaskTag
+
+    return list(
+        TaskTag.objects.filter(task__in=queryset.order_by().values('pk'))
+        .values('tag').annotate(count=Count('id')).order_by('-count', 'tag')
+    )
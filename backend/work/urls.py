@@ -1,7 +1,8 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ProjectViewSet, TaskViewSet, DocViewSet, TimeEntryViewSet, ClientViewViewSet, CommentViewSet, AttachmentViewSet, SubTaskViewSet, EventViewSet, ScheduleViewSet, TimerViewSet
+from .views import ProjectViewSet, TaskViewSet, DocViewSet, TimeEntryViewSet, ClientViewViewSet, CommentViewSet, AttachmentViewSet, SubTaskViewSet, EventViewSet, ScheduleViewSet, TimerViewSet, SearchViewSet, EventExceptionViewSet, AgendaViewSet, SyncViewSet, CacheStatsViewSet
 from .views_init import initialize_production_data
+from .views_live import live_updates
 from .views_simple_init import simple_init
 
 router = DefaultRouter()
@@ -15,10 +16,16 @@ router.register(r'comments', CommentViewSet)
 router.register(r'attachments', AttachmentViewSet)
 router.register(r'subtasks', SubTaskViewSet)
 router.register(r'events', EventViewSet)
+router.register(r'event-exceptions', EventExceptionViewSet)
 router.register(r'schedules', ScheduleViewSet)
+router.register(r'search', SearchViewSet, basename='search')
+router.register(r'agenda', AgendaViewSet, basename='agenda')
+router.register(r'sync', SyncViewSet, basename='sync')
+router.register(r'cache-stats', CacheStatsViewSet, basename='cache-stats')
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('live/', live_updates, name='live_updates'),
     path('init-production/', initialize_production_data, name='init_production'),
     path('init-simple/', simple_init, name='simple_init'),
 ]
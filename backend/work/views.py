@@ -1,32 +1,198 @@
+from datetime import timedelta
+
 from rest_framework import viewsets, permissions
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from django.db.models import Q
-from .models import Project, Task, SubTask, Comment, Attachment, Doc, TimeEntry, ClientView, Event, Schedule, Timer
+from django.db import transaction
+from django.conf import settings
+from django.db.models import Prefetch, Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from . import live, project_stats, recurrence, response_cache, sync, tagging
+from .agenda import agenda
+from .conditional import ConditionalGetMixin, aggregate_state
+from .dates import day_range_filter, day_window, local_midnight, parse_day, parse_instant
+from .pagination import SearchPagination, WorkCursorPagination
+from .response_cache import cache_response, for_user
+from .ranking import key_between, rebalance
+from .reports import TEAM_DIMENSIONS, build_report, rollup_rows, team_rows
+from .search import SOURCES as SEARCH_SOURCES, describe as describe_hits, search
+from .streaming import csv_lines, json_document, ndjson_lines
+from .models import Project, Task, SubTask, Comment, Attachment, Doc, TimeEntry, ClientView, Event, EventException, Schedule, Timer, DailyTimeRollup, Tombstone
 from .serializers import (
-    ProjectSerializer, TaskSerializer, SubTaskSerializer,
+    ProjectSerializer, TaskSerializer, TaskListSerializer, TaskBulkSerializer, SubTaskSerializer,
     CommentSerializer, AttachmentSerializer, DocSerializer,
-    TimeEntrySerializer, ClientViewSerializer, EventSerializer, ScheduleSerializer, TimerSerializer
+    TimeEntrySerializer, ClientViewSerializer, EventSerializer, EventCalendarSerializer, EventExceptionSerializer,
+    ScheduleSerializer,
+    TimerSerializer
 )
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Project.objects.all().order_by('-created_at')
     serializer_class = ProjectSerializer
     permission_classes = [permissions.IsAuthenticated]
 
-class TaskViewSet(viewsets.ModelViewSet):
+    def get_expand(self):
+        """Relations à inclure, via ``?expand=tasks,tasks.comments`` ou ``?depth=0|1|2``"""
+        params = self.request.query_params
+        if 'expand' in params:
+            expand = set()
+            for path in filter(None, (p.strip() for p in params['expand'].split(','))):
+                parts = path.split('.')
+                # Un chemin imbriqué implique ses parents (tasks.comments => tasks)
+                expand.update('.'.join(parts[:i]) for i in range(1, len(parts) + 1))
+            return expand & set(ProjectSerializer.EXPANSIONS)
+        if 'depth' in params:
+            try:
+                depth = int(params['depth'])
+            except ValueError:
+                raise ValidationError({'depth': 'Doit être un entier.'})
+            return {path for path in ProjectSerializer.EXPANSIONS if path.count('.') < depth}
+        return set(ProjectSerializer.EXPANSIONS)
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        expand = self.get_expand()
+        if 'tasks' not in expand:
+            return qs
+        tasks = Task.objects.select_related('assignee')
+        if 'tasks.subtasks' in expand:
+            tasks = tasks.prefetch_related('subtasks')
+        if 'tasks.comments' in expand:
+            tasks = tasks.prefetch_related(Prefetch('comments', queryset=Comment.objects.select_related('author')))
+        if 'tasks.attachments' in expand:
+            tasks = tasks.prefetch_related('attachments')
+        return qs.prefetch_related(Prefetch('tasks', queryset=tasks))
+
+    def get_validators(self, queryset):
+        from django.utils import timezone
+
+        validators = super().get_validators(queryset)
+        expand = self.get_expand()
+        if 'tasks' in expand:
+            # Les tâches imbriquées comptent aussi, ainsi que leurs enfants inclus
+            tasks = Task.objects.filter(project__in=queryset.values('pk'))
+            validators.append(aggregate_state(tasks))
+            validators += _children_states(
+                tasks.values('pk'), [kind for kind in sync.TASK_CHILDREN if f'tasks.{kind}s' in expand]
+            )
+        # Statistiques d'avancement : versionnées à part (work.project_stats), sans toucher updated_at
+        validators.append((None, project_stats.last_change(queryset.values_list('pk', flat=True))))
+        # Le nombre de tâches en retard change avec le jour, sans écriture : minuit local compte
+        # comme une modification (ETag et Last-Modified, sinon If-Modified-Since d'hier renverrait 304)
+        validators.append((None, local_midnight(timezone.localdate())))
+        return validators
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['expand'] = self.get_expand()
+        return context
+
+def _count_per_task(model, **filters):
+    """Sous-requête corrélée comptant les lignes de ``model`` rattachées à la tâche"""
+    rows = model.objects.filter(task=OuterRef('pk'), **filters).order_by().values('task')
+    return Coalesce(Subquery(rows.annotate(c=Count('*')).values('c')), 0)
+
+def _children_states(tasks, kinds):
+    """États des enfants ``kinds`` des tâches ``tasks``, suppressions comprises (tombstones).
+
+    Les enfants ne touchent pas ``Task.updated_at`` : sans ces états, un
+    commentaire ajouté ou supprimé laisserait l'ETag de la tâche inchangée.
+    """
+    if not kinds:
+        return []
+    states = [aggregate_state(sync.TASK_CHILDREN[kind].objects.filter(task__in=tasks)) for kind in kinds]
+    # Une suppression fait baisser un nombre ; son instant fait aussi avancer Last-Modified
+    states.append(aggregate_state(
+        Tombstone.objects.filter(kind__in=kinds, parent_id__in=tasks), field='deleted_at'
+    ))
+    return states
+
+class SearchListMixin:
+    """``?q=`` : liste classée par pertinence via l'index plein texte (voir work.search).
+
+    Les autres filtres du ViewSet restent appliqués ; chaque élément reçoit
+    ``search_rank`` et ``snippet`` (HTML échappé, termes entourés de ``<mark>``).
+    """
+    search_kind = None
+
+    def list(self, request, *args, **kwargs):
+        if not request.query_params.get('q'):
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        paginator = SearchPagination()
+        results = search(request.query_params['q'], within={self.search_kind: queryset})
+        hits = paginator.paginate_queryset(results, request, view=self)
+        objects = queryset.in_bulk([hit.object_id for hit in hits])
+        hits = [hit for hit in hits if hit.object_id in objects]
+        data = self.get_serializer([objects[hit.object_id] for hit in hits], many=True).data
+        for item, hit in zip(data, hits):
+            item.update(search_rank=hit.score, snippet=hit.snippet)
+        return paginator.get_paginated_response(data)
+
+class SearchViewSet(viewsets.ViewSet):
+    """Recherche unifiée : ``/api/search/?q=...`` sur projets, tâches, docs, commentaires et événements.
+
+    ``?type=task,doc`` restreint les types. Une requête sur l'index pour la
+    page de résultats, puis une par type présent pour les décrire.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def list(self, request):
+        kinds = [kind for kind in request.query_params.get('type', '').split(',') if kind]
+        unknown = sorted(set(kinds) - set(SEARCH_SOURCES))
+        if unknown:
+            raise ValidationError({'type': f"Types inconnus : {', '.join(unknown)}"})
+        results = search(request.query_params.get('q', ''), kinds=kinds or None, user=request.user)
+        paginator = SearchPagination()
+        hits = paginator.paginate_queryset(results, request, view=self)
+        return paginator.get_paginated_response(describe_hits(hits))
+
+class TaskViewSet(ConditionalGetMixin, SearchListMixin, viewsets.ModelViewSet):
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = WorkCursorPagination
+    ordering = ('-updated_at', '-id')
+    search_kind = 'task'
+    # Actions renvoyant la représentation compacte
+    compact_actions = ('list', 'bulk')
+
+    def get_ordering(self):
+        """``?ordering=rank`` : ordre manuel des colonnes du kanban"""
+        if self.request.query_params.get('ordering') == 'rank':
+            return ('rank', '-id')
+        return self.ordering
+
+    def get_serializer_class(self):
+        if self.action in self.compact_actions:
+            return TaskListSerializer
+        return TaskSerializer
+
+    def get_validators(self, queryset):
+        # Compteurs (liste) ou collections (détail) des enfants : servis avec chaque tâche
+        return super().get_validators(queryset) + _children_states(queryset.values('pk'), list(sync.TASK_CHILDREN))
 
     def get_queryset(self):
-        qs = Task.objects.all().select_related('project', 'assignee').order_by('-updated_at')
+        qs = Task.objects.all().select_related('assignee').order_by(*self.get_ordering())
+        if self.action in self.compact_actions:
+            qs = qs.annotate(
+                subtask_count=_count_per_task(SubTask),
+                subtask_done_count=_count_per_task(SubTask, is_done=True),
+                comment_count=_count_per_task(Comment),
+                attachment_count=_count_per_task(Attachment),
+            )
+        else:
+            qs = qs.prefetch_related(
+                'subtasks', 'attachments',
+                Prefetch('comments', queryset=Comment.objects.select_related('author')),
+            )
         project_id = self.request.query_params.get('project')
         status_param = self.request.query_params.get('status')
         assignee_id = self.request.query_params.get('assignee')
         priority = self.request.query_params.get('priority')
-        search = self.request.query_params.get('q')
         if project_id:
             qs = qs.filter(project_id=project_id)
         if status_param:
@@ -35,24 +201,148 @@ class TaskViewSet(viewsets.ModelViewSet):
             qs = qs.filter(assignee_id=assignee_id)
         if priority:
             qs = qs.filter(priority=priority)
-        if search:
-            qs = qs.filter(Q(title__icontains=search) | Q(description__icontains=search))
+        tags = self.request.query_params.getlist('tag')
+        if tags:
+            match = self.request.query_params.get('tag_match', 'any')
+            if match not in ('any', 'all'):
+                raise ValidationError({'tag_match': "Valeurs possibles : any, all"})
+            qs = tagging.filter_tasks(qs, tags, match)
         return qs
 
+    def perform_create(self, serializer):
+        # Nouvelle tâche en tête de sa colonne
+        data = serializer.validated_data
+        serializer.save(rank=self._rank_between(data['project'].pk, data.get('status', 'todo')))
+
+    def _rank_between(self, project_id, status, after=None, before=None, exclude=None):
+        """Clé de rang entre deux tâches de la colonne ; une borne absente est lue dans l'index.
+
+        Si la clé dépasse ``TASK_RANK_MAX_LENGTH`` (insertions répétées au même
+        endroit), la colonne est rééquilibrée dans la requête avant de recalculer.
+        """
+        key = self._key_between(project_id, status, after, before, exclude)
+        if len(key) > settings.TASK_RANK_MAX_LENGTH:
+            with transaction.atomic():
+                rebalance(Task.objects.select_for_update().filter(project_id=project_id, status=status).exclude(pk=exclude))
+            for neighbour in (after, before):
+                if neighbour is not None:
+                    neighbour.refresh_from_db(fields=['rank'])
+            # Les autres clients ont d'anciennes clés pour toute la colonne
+            live.publish([f'project:{project_id}'], 'task.reranked', project=project_id, status=status)
+            key = self._key_between(project_id, status, after, before, exclude)
+        return key
+
+    def _key_between(self, project_id, status, after, before, exclude):
+        column = Task.objects.filter(project_id=project_id, status=status).exclude(pk=exclude).exclude(rank='')
+        lower = after.rank if after is not None else None
+        upper = before.rank if before is not None else None
+        if after is not None and before is None:
+            upper = column.filter(rank__gt=lower).order_by('rank').values_list('rank', flat=True).first()
+        elif after is None:
+            if upper is None:
+                upper = column.order_by('rank').values_list('rank', flat=True).first()
+            else:
+                lower = column.filter(rank__lt=upper).order_by('-rank').values_list('rank', flat=True).first()
+        return key_between(lower or None, upper)
+
     @action(detail=True, methods=['post'])
     def move(self, request, pk=None):
+        """Change la colonne et/ou la position d'une tâche en ne modifiant qu'une ligne.
+
+        ``after`` / ``before`` : identifiants des tâches entre lesquelles la placer
+        (dans la colonne cible) ; sans eux, la tâche passe en tête de colonne.
+        """
         task = self.get_object()
-        new_status = request.data.get('status')
-        if new_status in dict(Task.STATUS_CHOICES):
-            task.status = new_status
-            task.save(update_fields=['status'])
-            return Response(self.get_serializer(task).data)
-        return Response({'detail': 'Invalid status'}, status=400)
-
-class CommentViewSet(viewsets.ModelViewSet):
+        new_status = request.data.get('status', task.status)
+        if new_status not in dict(Task.STATUS_CHOICES):
+            return Response({'detail': 'Invalid status'}, status=400)
+        column = Task.objects.filter(project_id=task.project_id, status=new_status)
+        if column.filter(rank='').exclude(pk=task.pk).exists():
+            # Tâches créées hors API (seed, admin…) : on classe la colonne une fois
+            rebalance(column.exclude(pk=task.pk))
+        neighbours = {}
+        for name in ('after', 'before'):
+            if request.data.get(name) not in (None, ''):
+                neighbour = Task.objects.filter(
+                    pk=request.data[name], project_id=task.project_id, status=new_status
+                ).exclude(pk=task.pk).only('rank').first()
+                if neighbour is None:
+                    return Response({'detail': f"Tâche '{name}' introuvable dans la colonne cible"}, status=400)
+                neighbours[name] = neighbour
+        try:
+            rank = self._rank_between(task.project_id, new_status, exclude=task.pk, **neighbours)
+        except ValueError:
+            return Response({'detail': "'after' doit précéder 'before'"}, status=400)
+        task.status, task.rank = new_status, rank
+        task.save(update_fields=['status', 'rank', 'updated_at'])
+        return Response(self.get_serializer(task).data)
+
+    @action(detail=False, methods=['get'])
+    def tags(self, request):
+        """Nombre de tâches par tag, calculé en SQL sur la table TaskTag.
+
+        Accepte les mêmes filtres que la liste (``project``, ``status``, ``tag``…).
+        """
+        return Response(tagging.counts(self.filter_queryset(self.get_queryset())))
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Modifie ou supprime plusieurs tâches en une requête et une transaction.
+
+        Corps : ``{"ids": [...], "status"|"priority"|"assignee": ..., "add_tags": [...],
+        "remove_tags": [...]}`` ou ``{"ids": [...], "delete": true}``. Tout ou rien :
+        un identifiant inconnu annule l'opération.
+        """
+        from django.utils import timezone
+
+        params = TaskBulkSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+        ids = data['ids']
+
+        with transaction.atomic():
+            tasks = Task.objects.select_for_update().filter(pk__in=ids)
+            found = set(tasks.values_list('pk', flat=True))
+            missing = [pk for pk in ids if pk not in found]
+            if missing:
+                raise ValidationError({'ids': f"Tâches introuvables : {missing}"})
+
+            if data['delete']:
+                Task.objects.filter(pk__in=ids).delete()
+                return Response({'deleted': len(ids)})
+
+            now = timezone.now()
+            fields = {name: data[name] for name in ('status', 'priority', 'assignee') if name in data}
+            if fields:
+                # update() ne gère pas auto_now : updated_at est posé explicitement
+                Task.objects.filter(pk__in=ids).update(updated_at=now, **fields)
+                project_stats.invalidate(Task.objects.filter(pk__in=ids).values_list('project_id', flat=True).distinct())
+            if data.get('add_tags') or data.get('remove_tags'):
+                add, remove = data.get('add_tags', []), set(data.get('remove_tags', []))
+                changed = []
+                for task in Task.objects.filter(pk__in=ids).only('id', 'tags'):
+                    tags = [tag for tag in (task.tags or []) if tag not in remove]
+                    tags += [tag for tag in add if tag not in tags]
+                    if tags != task.tags:
+                        task.tags, task.updated_at = tags, now
+                        changed.append(task)
+                Task.objects.bulk_update(changed, ['tags', 'updated_at'], batch_size=500)
+                # bulk_update n'envoie pas post_save
+                tagging.sync(changed)
+
+        tasks = list(self.get_queryset().filter(pk__in=ids))
+        for task in tasks:
+            # update() / bulk_update n'envoient pas post_save
+            live.task_saved(task)
+        return Response({'updated': len(ids), 'tasks': self.get_serializer(tasks, many=True).data})
+
+class CommentViewSet(SearchListMixin, viewsets.ModelViewSet):
     queryset = Comment.objects.all().select_related('author', 'task').order_by('-created_at')
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = WorkCursorPagination
+    ordering = ('-created_at', '-id')
+    search_kind = 'comment'
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
@@ -67,10 +357,13 @@ class SubTaskViewSet(viewsets.ModelViewSet):
     serializer_class = SubTaskSerializer
     permission_classes = [permissions.IsAuthenticated]
 
-class DocViewSet(viewsets.ModelViewSet):
+class DocViewSet(ConditionalGetMixin, SearchListMixin, viewsets.ModelViewSet):
     queryset = Doc.objects.all().order_by('-updated_at')
     serializer_class = DocSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = WorkCursorPagination
+    ordering = ('-updated_at', '-id')
+    search_kind = 'doc'
 
 class TimeEntryViewSet(viewsets.ModelViewSet):
     queryset = TimeEntry.objects.all().order_by('-started_at')
@@ -82,10 +375,54 @@ class ClientViewViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = ClientViewSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+def _request_window(request):
+    params = request.query_params
+    return day_window(params.get('start_date'), params.get('end_date'), settings.EVENT_MAX_WINDOW_DAYS)
+
+def _window_events(request, window_start, window_end, related=()):
+    """Événements de l'utilisateur pouvant avoir une occurrence dans la fenêtre.
+
+    Deux parcours de l'index (user, is_recurring, start, end) plutôt qu'un OR :
+    les ponctuels qui chevauchent la fenêtre, puis les récurrents commencés
+    avant sa fin (déroulés ensuite par work.recurrence).
+    """
+    # Sans ORDER BY (trié après expansion) : le planificateur peut choisir l'index de fenêtre
+    events = Event.objects.filter(user=request.user).select_related(*related).order_by()
+    if request.query_params.get('event_type'):
+        events = events.filter(event_type=request.query_params['event_type'])
+    if request.query_params.get('project'):
+        events = events.filter(project_id=request.query_params['project'])
+    # Value() : comparaison d'égalité (``is_recurring = ?``) utilisable par l'index,
+    # là où ``is_recurring=False`` produit ``NOT is_recurring``
+    single = events.filter(is_recurring=Value(False), start_datetime__lt=window_end, end_datetime__gt=window_start)
+    recurring = events.filter(is_recurring=Value(True), start_datetime__lt=window_end)
+    return list(single) + list(recurring)
+
+def _occurrence_items(events, serializer, window_start, window_end):
+    """Données sérialisées de chaque occurrence : l'événement, aux heures de l'occurrence"""
+    base = {event.pk: data for event, data in zip(events, serializer.data)}
+    datetime_field = EventSerializer().fields['start_datetime']
+    results = []
+    for occurrence in recurrence.occurrences(events, window_start, window_end):
+        item = dict(base[occurrence.event.pk])
+        item.update(
+            title=occurrence.title,
+            start_datetime=datetime_field.to_representation(occurrence.start),
+            end_datetime=datetime_field.to_representation(occurrence.end),
+            occurrence_start=datetime_field.to_representation(occurrence.occurrence_start),
+            is_exception=occurrence.is_exception,
+        )
+        if 'duration_minutes' in item:
+            item['duration_minutes'] = int((occurrence.end - occurrence.start).total_seconds() / 60)
+        results.append(item)
+    return results
+
 class EventViewSet(viewsets.ModelViewSet):
     queryset = Event.objects.all()
     serializer_class = EventSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = WorkCursorPagination
+    ordering = ('start_datetime', 'id')
 
     def get_queryset(self):
         qs = Event.objects.filter(user=self.request.user).order_by('start_datetime')
@@ -97,9 +434,9 @@ class EventViewSet(viewsets.ModelViewSet):
         project_id = self.request.query_params.get('project')
         
         if start_date:
-            qs = qs.filter(start_datetime__date__gte=start_date)
+            qs = qs.filter(**day_range_filter('start_datetime', start_date=start_date))
         if end_date:
-            qs = qs.filter(end_datetime__date__lte=end_date)
+            qs = qs.filter(**day_range_filter('end_datetime', end_date=end_date))
         if event_type:
             qs = qs.filter(event_type=event_type)
         if project_id:
@@ -110,6 +447,175 @@ class EventViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    @cache_response('events.list', for_user('events'))
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cache_response('events.detail', for_user('events'))
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @action(detail=False, methods=['get'])
+    @cache_response('events.occurrences', for_user('events'))
+    def occurrences(self, request):
+        """Occurrences chevauchant les jours [start_date, end_date], récurrences déroulées.
+
+        Chaque élément reprend l'événement avec ``start_datetime`` / ``end_datetime``
+        de l'occurrence ; ``occurrence_start`` (début prévu par la règle) permet de
+        créer une exception. Filtres ``event_type`` et ``project`` comme la liste.
+        """
+        window_start, window_end = _request_window(request)
+        events = _window_events(request, window_start, window_end, related=('project', 'task'))
+        serializer = self.get_serializer(events, many=True)
+        return Response(_occurrence_items(events, serializer, window_start, window_end))
+
+    @action(detail=False, methods=['get'])
+    @cache_response('events.calendar', for_user('events'))
+    def calendar(self, request):
+        """Événements chevauchant [from, to) pour les vues mois/semaine, charge utile compacte.
+
+        ``from`` / ``to`` : date (minuit local) ou date-heure ISO 8601. Récurrences
+        déroulées comme ``occurrences`` ; ``?fields=description,location,...`` ajoute
+        des champs (voir ``EventCalendarSerializer.OPTIONAL_FIELDS``).
+        """
+        params = request.query_params
+        window_start = parse_instant(params.get('from'), 'from')
+        window_end = parse_instant(params.get('to'), 'to')
+        if window_end <= window_start:
+            raise ValidationError({'to': 'Doit être postérieure à from.'})
+        if window_end - window_start > timedelta(days=settings.EVENT_MAX_WINDOW_DAYS):
+            raise ValidationError({'to': f'Fenêtre limitée à {settings.EVENT_MAX_WINDOW_DAYS} jours.'})
+        include = {name for name in params.get('fields', '').split(',') if name}
+        unknown = include - set(EventCalendarSerializer.OPTIONAL_FIELDS)
+        if unknown:
+            raise ValidationError({'fields': f"Champs inconnus : {', '.join(sorted(unknown))}"})
+        related = [name for name, field in (('project', 'project_name'), ('task', 'task_title')) if field in include]
+        events = _window_events(request, window_start, window_end, related=related)
+        serializer = EventCalendarSerializer(events, many=True, include=include)
+        return Response(_occurrence_items(events, serializer, window_start, window_end))
+
+class EventExceptionViewSet(viewsets.ModelViewSet):
+    queryset = EventException.objects.all()
+    serializer_class = EventExceptionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        qs = EventException.objects.filter(event__user=self.request.user)
+        event_id = self.request.query_params.get('event')
+        if event_id:
+            qs = qs.filter(event_id=event_id)
+        return qs
+
+class AgendaViewSet(viewsets.ViewSet):
+    """``/api/agenda/?start_date=&end_date=`` : événements et créneaux des Schedule, triés.
+
+    Chaque élément porte ``source`` (``event`` ou ``schedule``) et l'``id`` de
+    l'objet d'origine ; heures dans le fuseau local.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def list(self, request):
+        window_start, window_end = _request_window(request)
+        events = list(_window_events(request, window_start, window_end))
+        return Response(agenda(request.user, events, window_start, window_end))
+
+class SyncViewSet(viewsets.ViewSet):
+    """Synchronisation incrémentale : ``/api/sync/?since=<cursor>&type=task,event`` (voir work.sync).
+
+    Renvoie ``cursor`` à repasser au prochain appel, ``has_more`` (rappeler
+    aussitôt avec ce curseur : la synchronisation continue), ``full`` (sur la
+    première page : le client remplace alors sa copie), ``changed`` (objets par
+    type, tâches au format compact, projets sans tâches imbriquées, au plus
+    ``SYNC_PAGE_SIZE`` en tout) et ``deleted`` (identifiants par type, sur la
+    dernière page).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializers = {
+        'project': ProjectSerializer,
+        'task': TaskListSerializer,
+        'event': EventSerializer,
+        'doc': DocSerializer,
+    }
+
+    def list(self, request):
+        from django.utils import timezone
+
+        # Instant pris avant les lectures : rien de ce qui suit ne peut être manqué
+        now = timezone.now()
+        kinds = [kind for kind in request.query_params.get('type', '').split(',') if kind] or list(sync.SOURCES)
+        unknown = sorted(set(kinds) - set(sync.SOURCES))
+        if unknown:
+            raise ValidationError({'type': f"Types inconnus : {', '.join(unknown)}"})
+        cursor = None
+        if request.query_params.get('since'):
+            try:
+                cursor = sync.decode_cursor(request.query_params['since'])
+            except (ValueError, OverflowError):
+                raise ValidationError({'since': 'Curseur invalide.'})
+        if isinstance(cursor, sync.Position):
+            if cursor.kind not in kinds:
+                raise ValidationError({'since': "Curseur d'une synchronisation d'autres types."})
+            # Suite d'une synchronisation : mêmes bornes que sa première page
+            position, since, until = cursor, cursor.since, cursor.until
+            full = first = False
+        else:
+            position, since, until = None, cursor, now
+            full, first = since is None or since < sync.horizon(now), True
+            if full:
+                since = None
+
+        budget = settings.SYNC_PAGE_SIZE
+        changed, next_position = {kind: [] for kind in kinds}, None
+        start = kinds.index(position.kind) if position else 0
+        for kind in kinds[start:]:
+            if not budget:
+                next_position = sync.Position(since, until, kind, None, None)
+                break
+            after = (position.updated_at, position.id) if position and kind == position.kind and position.id else None
+            rows = list(self._related(kind, sync.changed(kind, request.user, since, until, after))[:budget + 1])
+            if len(rows) > budget:
+                rows = rows[:budget]
+                next_position = sync.Position(since, until, kind, rows[-1].updated_at, rows[-1].pk)
+            serializer = self.serializers[kind](rows, many=True, context={'request': request, 'expand': set()})
+            changed[kind] = serializer.data
+            budget -= len(rows)
+            if next_position:
+                break
+
+        has_more = next_position is not None
+        return Response({
+            'cursor': sync.encode_cursor(next_position if has_more else until),
+            'has_more': has_more,
+            'full': full and first,
+            'changed': changed,
+            'deleted': (
+                sync.deleted(kinds, request.user, since) if since is not None and not has_more
+                else {kind: [] for kind in kinds}
+            ),
+        })
+
+    @staticmethod
+    def _related(kind, qs):
+        if kind == 'task':
+            return qs.select_related('assignee').annotate(
+                subtask_count=_count_per_task(SubTask),
+                subtask_done_count=_count_per_task(SubTask, is_done=True),
+                comment_count=_count_per_task(Comment),
+                attachment_count=_count_per_task(Attachment),
+            )
+        if kind == 'event':
+            return qs.select_related('project', 'task')
+        if kind == 'doc':
+            return qs.select_related('author')
+        return qs
+
+class CacheStatsViewSet(viewsets.ViewSet):
+    """Compteurs hits / misses du cache de réponses par vue (staff), pour la supervision"""
+    permission_classes = [permissions.IsAdminUser]
+
+    def list(self, request):
+        return Response(response_cache.stats())
+
 class ScheduleViewSet(viewsets.ModelViewSet):
     queryset = Schedule.objects.all()
     serializer_class = ScheduleSerializer
@@ -121,6 +627,10 @@ class ScheduleViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    @cache_response('schedules.list', for_user('schedules'))
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
 
 class TimerViewSet(viewsets.ModelViewSet):
     queryset = Timer.objects.all()
@@ -162,18 +672,23 @@ class TimerViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def active(self, request):
         """Récupère le timer actif de l'utilisateur"""
-        try:
-            timer = Timer.objects.get(user=request.user)
-            return Response(TimerSerializer(timer).data)
-        except Timer.DoesNotExist:
+        # L'instance est mise en cache, pas la réponse : elapsed_minutes dépend de l'heure courante
+        timer = response_cache.cached(
+            'timers.active', request, [f'timer:{request.user.pk}'],
+            lambda: Timer.objects.select_related('task__project').filter(user=request.user).first(),
+        )
+        if timer is None:
             return Response({'active_timer': None})
+        return Response(TimerSerializer(timer).data)
 
 
 class TimeEntryViewSet(viewsets.ModelViewSet):
     queryset = TimeEntry.objects.all()
     serializer_class = TimeEntrySerializer
     permission_classes = [permissions.IsAuthenticated]
-    
+    pagination_class = WorkCursorPagination
+    ordering = ('-started_at', '-id')
+
     def get_queryset(self):
         qs = TimeEntry.objects.filter(user=self.request.user).select_related('task', 'task__project')
         
@@ -187,10 +702,8 @@ class TimeEntryViewSet(viewsets.ModelViewSet):
             qs = qs.filter(task_id=task_id)
         if project_id:
             qs = qs.filter(task__project_id=project_id)
-        if start_date:
-            qs = qs.filter(started_at__date__gte=start_date)
-        if end_date:
-            qs = qs.filter(started_at__date__lte=end_date)
+        if start_date or end_date:
+            qs = qs.filter(**day_range_filter('started_at', start_date, end_date))
             
         return qs.order_by('-started_at')
     
@@ -198,67 +711,79 @@ class TimeEntryViewSet(viewsets.ModelViewSet):
         serializer.save(user=self.request.user)
     
     @action(detail=False, methods=['get'])
+    @cache_response('time_entries.reports', for_user('reports'))
     def reports(self, request):
         """Génère des rapports de temps"""
         from django.utils import timezone
         from datetime import timedelta
-        from django.db.models import Sum, Count
         
         # Période par défaut: 7 derniers jours
-        end_date = timezone.now().date()
+        end_date = timezone.localdate()
         start_date = end_date - timedelta(days=7)
         
         # Paramètres optionnels
         if request.query_params.get('start_date'):
-            start_date = timezone.datetime.strptime(request.query_params.get('start_date'), '%Y-%m-%d').date()
+            start_date = parse_day(request.query_params.get('start_date'), 'start_date')
         if request.query_params.get('end_date'):
-            end_date = timezone.datetime.strptime(request.query_params.get('end_date'), '%Y-%m-%d').date()
-        
-        entries = TimeEntry.objects.filter(
-            user=request.user,
-            started_at__date__range=[start_date, end_date]
-        ).select_related('task', 'task__project')
+            end_date = parse_day(request.query_params.get('end_date'), 'end_date')
         
-        # Statistiques globales
-        total_time = entries.aggregate(total=Sum('duration_minutes'))['total'] or 0
-        total_entries = entries.count()
-        
-        # Par projet
-        by_project = entries.values(
-            'task__project__name', 'task__project__id'
-        ).annotate(
-            total_minutes=Sum('duration_minutes'),
-            entry_count=Count('id')
-        ).order_by('-total_minutes')
-        
-        # Par tâche
-        by_task = entries.values(
-            'task__title', 'task__id', 'task__project__name'
-        ).annotate(
-            total_minutes=Sum('duration_minutes'),
-            entry_count=Count('id')
-        ).order_by('-total_minutes')
-        
-        # Par jour
-        by_day = {}
-        for entry in entries:
-            day = entry.started_at.date().isoformat()
-            if day not in by_day:
-                by_day[day] = 0
-            by_day[day] += entry.duration_minutes
-        
-        return Response({
-            'period': {
-                'start_date': start_date,
-                'end_date': end_date
-            },
-            'summary': {
-                'total_minutes': total_time,
-                'total_hours': round(total_time / 60, 2),
-                'total_entries': total_entries,
-                'avg_per_day': round(total_time / max(1, (end_date - start_date).days + 1), 1)
-            },
-            'by_project': list(by_project),
-            'by_task': list(by_task),
-            'by_day': by_day
-        })
+        rollups = DailyTimeRollup.objects.filter(user=request.user, day__range=(start_date, end_date))
+        return Response(build_report(rollup_rows(rollups), start_date, end_date))
+
+    EXPORT_COLUMNS = [
+        'id', 'task_id', 'task_title', 'project_id', 'project_name',
+        'started_at', 'ended_at', 'duration_minutes', 'description', 'created_at',
+    ]
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Export en flux des entrées de temps (``?output=csv|ndjson``), mêmes filtres que la liste"""
+        from django.utils import timezone
+
+        output = request.query_params.get('output', 'csv')
+        if output not in ('csv', 'ndjson'):
+            raise ValidationError({'output': 'Valeurs possibles : csv, ndjson.'})
+        rows = self.filter_queryset(self.get_queryset()).values(
+            'id', 'task_id', 'started_at', 'ended_at', 'duration_minutes', 'description', 'created_at',
+            task_title=F('task__title'), project_id=F('task__project_id'), project_name=F('task__project__name'),
+        ).iterator(chunk_size=2000)
+        if output == 'csv':
+            response = StreamingHttpResponse(csv_lines(self.EXPORT_COLUMNS, rows), content_type='text/csv; charset=utf-8')
+        else:
+            response = StreamingHttpResponse(ndjson_lines(rows), content_type='application/x-ndjson')
+        filename = f'time_entries_{request.user.personal_identifier}_{timezone.localdate().isoformat()}.{output}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    @action(detail=False, methods=['get'], url_path='team-reports', permission_classes=[permissions.IsAdminUser])
+    def team_reports(self, request):
+        """Rapport d'équipe (staff) : ``?group_by=user,project,task,day|week|month`` sur une période.
+
+        Calculé en SQL sur les rollups journaliers et renvoyé en flux JSON.
+        Filtres optionnels : ``user``, ``project``, ``task``.
+        """
+        from django.utils import timezone
+        from datetime import timedelta
+
+        params = request.query_params
+        end_date = parse_day(params['end_date'], 'end_date') if params.get('end_date') else timezone.localdate()
+        start_date = parse_day(params['start_date'], 'start_date') if params.get('start_date') else end_date - timedelta(days=30)
+        group_by = list(dict.fromkeys(
+            name.strip() for name in params.get('group_by', 'user,project').split(',') if name.strip()
+        ))
+        unknown = [name for name in group_by if name not in TEAM_DIMENSIONS]
+        if unknown:
+            raise ValidationError({'group_by': f"Dimensions inconnues : {', '.join(unknown)}. "
+                                               f"Valeurs possibles : {', '.join(TEAM_DIMENSIONS)}."})
+
+        rollups = DailyTimeRollup.objects.filter(day__range=(start_date, end_date))
+        for param in ('user', 'project', 'task'):
+            if params.get(param):
+                rollups = rollups.filter(**{f'{param}_id': params[param]})
+
+        head = {
+            'period': {'start_date': start_date, 'end_date': end_date},
+            'group_by': group_by,
+        }
+        rows = team_rows(rollups, group_by)
+        return StreamingHttpResponse(json_document(head, 'rows', rows), content_type='application/json')
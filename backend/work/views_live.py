@@ -0,0 +1,55 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+
+from . import live
+
+
+def _authenticate(request):
+    # Jeton vérifié sans lecture de l'utilisateur : le service ASGI n'a pas besoin de la base
+    try:
+        result = JWTStatelessUserAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+    return result[0] if result else None
+
+
+async def live_updates(request):
+    """Flux SSE des changements : ``/api/live/?project=1&project=2`` (voir work.live).
+
+    Authentification par ``Authorization: Bearer`` (le client lit le flux avec
+    ``fetch``). Sans ``project``, tous les projets sont suivis ; les timers et
+    événements de l'utilisateur le sont toujours. Un commentaire ``: ping``
+    est envoyé toutes les ``LIVE_HEARTBEAT`` secondes sans activité.
+    """
+    if not isinstance(request, ASGIRequest):
+        # Sous WSGI (runserver, gunicorn), un flux infini bloquerait un thread : les pages se rabattent sur le rechargement
+        return JsonResponse({'detail': "Flux temps réel disponible uniquement sous ASGI."}, status=501)
+    user = await sync_to_async(_authenticate)(request)
+    if user is None:
+        return JsonResponse({'detail': "Informations d'authentification non fournies ou invalides."}, status=401)
+    projects = request.GET.getlist('project')
+    if not all(project.isdigit() for project in projects):
+        return JsonResponse({'project': 'Identifiants de projet attendus.'}, status=400)
+    patterns = [f'user:{user.pk}'] + ([f'project:{int(project)}' for project in projects] or ['project:*'])
+
+    response = StreamingHttpResponse(_stream(patterns), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Pas de mise en tampon par un proxy nginx
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+async def _stream(patterns):
+    # Abonnement dans le générateur : il est libéré (finally) à la déconnexion du client
+    subscription = await live.get_backend().subscribe(patterns)
+    try:
+        yield 'retry: 5000\n\n'
+        while True:
+            message = await subscription.get(settings.LIVE_HEARTBEAT)
+            yield ': ping\n\n' if message is None else f'data: {message}\n\n'
+    finally:
+        await subscription.close()
@@ -5,6 +5,7 @@ import { motion } from 'framer-motion'
 import Card from '@/components/ui/Card'
 import Button from '@/components/ui/Button'
 import Badge from '@/components/ui/Badge'
+import { collectPages } from '@/lib/pagination'
 import { 
   FolderKanban, 
   Clock, 
@@ -18,7 +19,10 @@ import {
 } from 'lucide-react'
 import Link from 'next/link'
 
-type Project = { id: number; name: string; status: string; deadline?: string; client?: string }
+type Project = {
+  id: number; name: string; status: string; deadline?: string; client?: string
+  task_counts_by_status: Record<string, number>; overdue_count: number; logged_minutes: number; next_deadline: string | null
+}
 type Task = { id: number; title: string; status: string; priority: string; project: number }
 
 export default function DashboardPage() {
@@ -68,7 +72,8 @@ export default function DashboardPage() {
       console.log('Loading data with headers:', headers)
       
       // Faire les requêtes une par une pour déboguer
-      let pr = await fetch(apiUrl + "/api/projects/", { headers })
+      // Projets sans arbre de tâches : les compteurs d'avancement sont calculés côté serveur
+      let pr = await fetch(apiUrl + "/api/projects/?depth=0", { headers })
       console.log('Projects response:', pr.status, pr.statusText)
       
       // Si 401, essayer de rafraîchir le token
@@ -77,21 +82,24 @@ export default function DashboardPage() {
         const refreshed = await refreshToken()
         if (refreshed) {
           headers = getHeaders()
-          pr = await fetch(apiUrl + "/api/projects/", { headers })
+          pr = await fetch(apiUrl + "/api/projects/?depth=0", { headers })
           console.log('Projects response after refresh:', pr.status, pr.statusText)
         }
       }
       
       if (!pr.ok) throw new Error(`Erreur projets: ${pr.status}`)
       
-      const tr = await fetch(apiUrl + "/api/tasks/", { headers })
-      console.log('Tasks response:', tr.status, tr.statusText)
-      if (!tr.ok) throw new Error(`Erreur tâches: ${tr.status}`)
+      // Seules les tâches urgentes et hautes sont listées
+      const [ur, hr] = await Promise.all([
+        fetch(apiUrl + "/api/tasks/?priority=urgent", { headers }),
+        fetch(apiUrl + "/api/tasks/?priority=high", { headers })
+      ])
+      if (!ur.ok || !hr.ok) throw new Error(`Erreur tâches: ${ur.ok ? hr.status : ur.status}`)
       
-      const [p, t] = await Promise.all([pr.json(), tr.json()])
-      console.log('Data loaded:', { projects: p.length, tasks: t.length })
+      const [p, urgent, high] = await Promise.all([pr.json(), collectPages<Task>(ur, headers), collectPages<Task>(hr, headers)])
+      console.log('Data loaded:', { projects: p.length, tasks: urgent.length + high.length })
       setProjects(p)
-      setTasks(t)
+      setTasks(urgent.concat(high))
     } catch (e: any) { 
       console.error('Load error:', e)
       setError(e.message) 
@@ -102,8 +110,9 @@ export default function DashboardPage() {
   const logout = () => { localStorage.clear(); window.location.href = "/login" }
 
   const activeProjects = projects.filter(p => p.status === 'active')
+  const countTasks = (statuses: string[]) =>
+    projects.reduce((sum, p) => sum + statuses.reduce((s, status) => s + (p.task_counts_by_status?.[status] || 0), 0), 0)
   const tasksInProgress = tasks.filter(t => t.status !== 'done')
-  const completedTasks = tasks.filter(t => t.status === 'done')
   const urgentTasks = tasks.filter(t => t.priority === 'urgent' && t.status !== 'done')
 
   const kpis = [
@@ -116,14 +125,14 @@ export default function DashboardPage() {
     },
     {
       title: "Tâches en cours",
-      value: tasksInProgress.length,
+      value: countTasks(['todo', 'doing']),
       icon: Clock,
       color: "from-amber-500 to-orange-500",
       bgColor: "from-amber-500/10 to-orange-500/10"
     },
     {
       title: "Tâches terminées",
-      value: completedTasks.length,
+      value: countTasks(['done']),
       icon: CheckCircle2,
       color: "from-emerald-500 to-green-500",
       bgColor: "from-emerald-500/10 to-green-500/10"
@@ -249,7 +258,11 @@ export default function DashboardPage() {
                 >
                   <div>
                     <p className="font-medium">{p.name}</p>
-                    <p className="text-sm text-neutral-400">{p.client || 'Pas de client'}</p>
+                    <p className="text-sm text-neutral-400">
+                      {p.client || 'Pas de client'}
+                      {' · '}{p.task_counts_by_status?.done || 0}/{Object.values(p.task_counts_by_status || {}).reduce((a, b) => a + b, 0)} tâches
+                      {p.overdue_count > 0 && <span className="text-red-400"> · {p.overdue_count} en retard</span>}
+                    </p>
                   </div>
                   <Badge tone={p.status === 'active' ? 'success' : 'neutral'}>
                     {p.status}
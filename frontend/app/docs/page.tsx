@@ -1,5 +1,6 @@
 "use client"
 import { useEffect, useState } from 'react'
+import { collectPages } from '@/lib/pagination'
 
 export default function DocsPage() {
   const [docs, setDocs] = useState<any[]>([])
@@ -12,7 +13,7 @@ export default function DocsPage() {
 
   useEffect(() => {
     fetch(api + '/api/docs/', { headers: headers() }).then(async r => {
-      if (r.ok) setDocs(await r.json())
+      if (r.ok) setDocs(await collectPages(r, headers()))
     })
   }, [])
 
@@ -5,6 +5,8 @@ import Card from '@/components/ui/Card'
 import Button from '@/components/ui/Button'
 import Input from '@/components/ui/Input'
 import Select from '@/components/ui/Select'
+import { collectPages } from '@/lib/pagination'
+import { subscribeLive } from '@/lib/live'
 import { 
   Calendar as CalendarIcon, 
   Clock, 
@@ -35,6 +37,8 @@ type Event = {
   project_name?: string
   task_title?: string
   duration_minutes: number
+  occurrence_start?: string
+  is_exception?: boolean
   priority?: 'low' | 'medium' | 'high' | 'urgent'
   status?: 'todo' | 'doing' | 'done'
   task_id?: number
@@ -150,13 +154,17 @@ export default function PlanningPage() {
         endDate = new Date(currentDate.getFullYear(), currentDate.getMonth() + 1, 0)
       }
 
+      // Fenêtre [from, to) : le lendemain du dernier jour affiché
+      const windowEnd = new Date(endDate)
+      windowEnd.setDate(endDate.getDate() + 1)
       const params = new URLSearchParams({
-        start_date: startDate.toISOString().split('T')[0],
-        end_date: endDate.toISOString().split('T')[0]
+        from: startDate.toISOString().split('T')[0],
+        to: windowEnd.toISOString().split('T')[0],
+        fields: 'description,location,duration_minutes,project_name,task_title'
       })
 
       // Charger les événements
-      let eventsRes = await fetch(`${api}/api/events/?${params}`, { headers: authHeaders })
+      let eventsRes = await fetch(`${api}/api/events/calendar/?${params}`, { headers: authHeaders })
       
       // Si 401, essayer de rafraîchir le token
       if (eventsRes.status === 401) {
@@ -164,12 +172,12 @@ export default function PlanningPage() {
         const refreshed = await refreshToken()
         if (refreshed) {
           authHeaders = headers()
-          eventsRes = await fetch(`${api}/api/events/?${params}`, { headers: authHeaders })
+          eventsRes = await fetch(`${api}/api/events/calendar/?${params}`, { headers: authHeaders })
         }
       }
       
       if (eventsRes.ok) {
-        const eventsData = await eventsRes.json()
+        const eventsData = await collectPages(eventsRes, authHeaders)
         setEvents(eventsData)
       } else {
         throw new Error(`Erreur lors du chargement des événements: ${eventsRes.status}`)
@@ -189,7 +197,7 @@ export default function PlanningPage() {
       }
       
       if (tasksRes.ok) {
-        const tasksData = await tasksRes.json()
+        const tasksData = await collectPages(tasksRes, authHeaders)
         // Filtrer les tâches qui ont une deadline dans la période affichée
         const tasksWithDeadlines = tasksData.filter((task: Task) => {
           if (!task.due_date) return false
@@ -209,6 +217,18 @@ export default function PlanningPage() {
 
   useEffect(() => { loadEvents() }, [currentDate, view])
 
+  // Événements modifiés ailleurs : recharger la fenêtre affichée
+  useEffect(() => {
+    let timeout: ReturnType<typeof setTimeout> | undefined
+    const stop = subscribeLive(api, headers, (message) => {
+      if (message.type.startsWith('event.') || message.type === 'resync') {
+        clearTimeout(timeout)
+        timeout = setTimeout(loadEvents, 300)
+      }
+    })
+    return () => { clearTimeout(timeout); stop() }
+  }, [currentDate, view])
+
   // Raccourcis clavier
   useEffect(() => {
     const handleKeyPress = (e: KeyboardEvent) => {
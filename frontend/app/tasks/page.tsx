@@ -6,6 +6,9 @@ import Button from '@/components/ui/Button'
 import Input from '@/components/ui/Input'
 import Select from '@/components/ui/Select'
 import Badge from '@/components/ui/Badge'
+import { collectPages } from '@/lib/pagination'
+import { subscribeLive } from '@/lib/live'
+import { clearStore, syncStore } from '@/lib/sync'
 import { 
   ListTodo, 
   Plus, 
@@ -44,11 +47,16 @@ type Task = {
   assignee?: number;
   assignee_name?: string;
   due_date?: string;
+  rank?: string;
   created_at: string;
   updated_at: string;
   comments?: any[]; 
   attachments?: any[]; 
   subtasks?: any[] 
+  subtask_count?: number;
+  subtask_done_count?: number;
+  comment_count?: number;
+  attachment_count?: number;
 }
 
 type Project = { id: number; name: string }
@@ -67,6 +75,35 @@ const priorityConfig = {
   urgent: { color: 'danger', icon: Zap, label: 'Urgente' }
 }
 
+// Au-delà, un rechargement complet coûte moins que des relectures une à une
+const MAX_LIVE_REFETCH = 20
+
+// Représentation détaillée (/api/tasks/<id>/) ramenée à celle des listes (compteurs)
+function toCard(data: any): Task {
+  const { subtasks = [], comments = [], attachments = [], ...task } = data
+  return {
+    ...task,
+    subtask_count: subtasks.length,
+    subtask_done_count: subtasks.filter((s: any) => s.is_done).length,
+    comment_count: comments.length,
+    attachment_count: attachments.length,
+  }
+}
+
+// Ordre du kanban (celui de ?ordering=rank) : rang croissant, puis id décroissant
+function byRank(a: Task, b: Task): number {
+  const ra = a.rank || '', rb = b.rank || ''
+  return ra < rb ? -1 : ra > rb ? 1 : b.id - a.id
+}
+
+// Place (ou replace) une tâche dans la liste selon l'ordre du kanban
+function placeByRank(tasks: Task[], task: Task): Task[] {
+  const rest = tasks.filter(t => t.id !== task.id)
+  const index = rest.findIndex(t => t.status === task.status && byRank(task, t) < 0)
+  if (index === -1) return [...rest, task]
+  return [...rest.slice(0, index), task, ...rest.slice(index)]
+}
+
 export default function TasksPage() {
   const api = process.env.NEXT_PUBLIC_API_URL
   const [projects, setProjects] = useState<Project[]>([])
@@ -95,14 +132,29 @@ export default function TasksPage() {
     return { Authorization: `Bearer ${access}`, "Content-Type": "application/json" }
   }
 
+  // Copie locale des tâches tenue à jour par /api/sync/ : seules les tâches modifiées depuis la
+  // dernière visite transitent ; liste complète si la synchronisation échoue
+  const loadTasks = async (): Promise<Task[] | null> => {
+    try {
+      const store = await syncStore(api, headers(), ["task"])
+      return Object.values(store.items.task || {}).sort(byRank)
+    } catch (error) {
+      console.error('Erreur de synchronisation:', error)
+      clearStore(["task"])
+      const tr = await fetch(api + "/api/tasks/?ordering=rank", { headers: headers() })
+      return tr.ok ? await collectPages(tr, headers()) : null
+    }
+  }
+
   const load = async () => {
     try {
-      const [pr, tr] = await Promise.all([
-        fetch(api + "/api/projects/", { headers: headers() }),
-        fetch(api + "/api/tasks/", { headers: headers() })
+      const [pr, synced] = await Promise.all([
+        // Noms des projets pour les filtres : sans arbre de tâches
+        fetch(api + "/api/projects/?depth=0", { headers: headers() }),
+        loadTasks()
       ])
       if (pr.ok) setProjects(await pr.json())
-      if (tr.ok) setTasks(await tr.json())
+      if (synced) setTasks(synced)
       
       // Simuler des utilisateurs pour l'assignation
       setUsers([
@@ -115,6 +167,57 @@ export default function TasksPage() {
   }
   useEffect(() => { load() }, [])
 
+  // Changements poussés par le serveur (autres onglets, autres utilisateurs) : appliqués à l'état
+  // local, seules les tâches concernées sont relues ; une colonne reclassée ou une rafale (action
+  // groupée) déclenche un rechargement complet
+  useEffect(() => {
+    let timeout: ReturnType<typeof setTimeout> | undefined
+    let pending = new Set<number>()
+    let reload = false
+
+    const flush = async () => {
+      const ids = Array.from(pending)
+      const full = reload || ids.length > MAX_LIVE_REFETCH
+      pending = new Set()
+      reload = false
+      if (full) return load()
+      for (const id of ids) {
+        const res = await fetch(`${api}/api/tasks/${id}/`, { headers: headers() })
+        if (res.ok) {
+          const task = toCard(await res.json())
+          setTasks(ts => placeByRank(ts, task))
+        } else if (res.status === 404) {
+          setTasks(ts => ts.filter(t => t.id !== id))
+        }
+      }
+    }
+    const schedule = () => {
+      clearTimeout(timeout)
+      timeout = setTimeout(flush, 300)
+    }
+
+    const stop = subscribeLive(api, headers, (message) => {
+      if (message.type === 'task.deleted') {
+        setTasks(ts => ts.filter(t => t.id !== message.id))
+      } else if (message.type === 'task.created' || message.type === 'task.updated') {
+        // Colonne et position tout de suite, le reste (titre, compteurs…) à la relecture
+        setTasks(ts => {
+          const current = ts.find(t => t.id === message.id)
+          return current ? placeByRank(ts, { ...current, status: message.status, rank: message.rank, project: message.project! }) : ts
+        })
+        pending.add(message.id!)
+        schedule()
+      } else if (message.type.startsWith('comment.') && message.task) {
+        pending.add(message.task)
+        schedule()
+      } else if (message.type === 'task.reranked' || message.type === 'resync') {
+        reload = true
+        schedule()
+      }
+    })
+    return () => { clearTimeout(timeout); stop() }
+  }, [])
+
   const filtered = useMemo(() => {
     const q = query.toLowerCase().trim()
     return tasks.filter(t => {
@@ -194,12 +297,11 @@ export default function TasksPage() {
         const updatedTask = await res.json()
         console.log('Tâche mise à jour:', updatedTask)
         
-        // Mettre à jour la tâche dans la liste locale
-        setTasks(prevTasks => 
-          prevTasks.map(t => 
-            t.id === dragId ? { ...t, status: newStatus } : t
-          )
-        )
+        // Mettre à jour la tâche dans la liste locale (placée en tête de colonne)
+        setTasks(prevTasks => [
+          { ...currentTask, status: newStatus, rank: updatedTask.rank },
+          ...prevTasks.filter(t => t.id !== dragId)
+        ])
       } else {
         const errorText = await res.text()
         console.error('Erreur API:', errorText)
@@ -506,16 +608,16 @@ export default function TasksPage() {
 
                         <div className="flex items-center justify-between text-xs text-neutral-500">
                           <div className="flex items-center gap-3">
-                            {(t.comments?.length || 0) > 0 && (
+                            {(t.comment_count || 0) > 0 && (
                               <div className="flex items-center gap-1">
                                 <MessageSquare className="w-3 h-3" />
-                                <span>{t.comments?.length}</span>
+                                <span>{t.comment_count}</span>
                               </div>
                             )}
-                            {(t.attachments?.length || 0) > 0 && (
+                            {(t.attachment_count || 0) > 0 && (
                               <div className="flex items-center gap-1">
                                 <Paperclip className="w-3 h-3" />
-                                <span>{t.attachments?.length}</span>
+                                <span>{t.attachment_count}</span>
                               </div>
                             )}
                           </div>
@@ -0,0 +1,49 @@
+// Flux SSE /api/live/ lu avec fetch (EventSource ne permet pas d'en-tête Authorization).
+// Reconnexion automatique ; si le serveur n'est pas ASGI (501), on abandonne : la page
+// garde ses rechargements habituels. Le flux est servi par un service ASGI distinct de l'API
+// (NEXT_PUBLIC_LIVE_URL), ou par l'API elle-même si la variable n'est pas définie.
+export type LiveMessage = { type: string, id?: number, project?: number, task?: number, [key: string]: any }
+
+export function subscribeLive(
+  api: string | undefined,
+  headers: () => HeadersInit | null,
+  onMessage: (message: LiveMessage) => void,
+  projects: number[] = []
+): () => void {
+  const controller = new AbortController()
+  let retry = 5000
+
+  const connect = async () => {
+    const auth = headers()
+    if (!auth || controller.signal.aborted) return
+    const params = projects.map(id => `project=${id}`).join("&")
+    try {
+      const base = process.env.NEXT_PUBLIC_LIVE_URL || api
+      const res = await fetch(`${base}/api/live/${params ? "?" + params : ""}`, { headers: auth, signal: controller.signal })
+      if (res.status === 501) return
+      if (!res.ok || !res.body) throw new Error(`Erreur flux temps réel: ${res.status}`)
+      const reader = res.body.pipeThrough(new TextDecoderStream()).getReader()
+      let buffer = ""
+      while (true) {
+        const { value, done } = await reader.read()
+        if (done) break
+        buffer += value
+        const blocks = buffer.split("\n\n")
+        buffer = blocks.pop() || ""
+        for (const block of blocks) {
+          for (const line of block.split("\n")) {
+            if (line.startsWith("retry: ")) retry = parseInt(line.slice(7)) || retry
+            if (line.startsWith("data: ")) onMessage(JSON.parse(line.slice(6)))
+          }
+        }
+      }
+    } catch (e) {
+      if (controller.signal.aborted) return
+      console.error(e)
+    }
+    setTimeout(connect, retry)
+  }
+
+  connect()
+  return () => controller.abort()
+}
@@ -0,0 +1,14 @@
+// Les collections paginées par curseur renvoient { next, previous, results },
+// les autres un simple tableau : on suit les liens `next` jusqu'au bout.
+export async function collectPages<T = any>(res: Response, headers: HeadersInit): Promise<T[]> {
+  let data = await res.json()
+  if (Array.isArray(data)) return data
+  let items: T[] = data.results
+  while (data.next) {
+    const next = await fetch(data.next, { headers })
+    if (!next.ok) throw new Error(`Erreur pagination: ${next.status}`)
+    data = await next.json()
+    items = items.concat(data.results)
+  }
+  return items
+}
@@ -0,0 +1,69 @@
+// Copie locale (localStorage) des projets, tâches, événements et docs, tenue à jour
+// par /api/sync/ : seuls les objets modifiés et les identifiants supprimés transitent.
+// Une copie par ensemble de types (le curseur du serveur porte sur les types demandés).
+export type SyncKind = "project" | "task" | "event" | "doc"
+
+export type SyncStore = {
+  cursor: string | null
+  items: Partial<Record<SyncKind, Record<number, any>>>
+}
+
+const STORAGE_PREFIX = "sync-store:"
+
+function storageKey(kinds: SyncKind[]) {
+  return STORAGE_PREFIX + kinds.join(",")
+}
+
+function emptyStore(kinds: SyncKind[]): SyncStore {
+  return { cursor: null, items: Object.fromEntries(kinds.map(kind => [kind, {}])) }
+}
+
+export function loadStore(kinds: SyncKind[]): SyncStore {
+  try {
+    const raw = localStorage.getItem(storageKey(kinds))
+    return raw ? JSON.parse(raw) : emptyStore(kinds)
+  } catch {
+    return emptyStore(kinds)
+  }
+}
+
+function saveStore(kinds: SyncKind[], store: SyncStore) {
+  try {
+    localStorage.setItem(storageKey(kinds), JSON.stringify(store))
+  } catch {
+    // Quota dépassé : pas de copie locale, la prochaine synchronisation sera complète
+    localStorage.removeItem(storageKey(kinds))
+  }
+}
+
+export function clearStore(kinds: SyncKind[]) {
+  localStorage.removeItem(storageKey(kinds))
+}
+
+// Synchronise la copie locale des types `kinds`, page par page tant que le serveur
+// annonce `has_more` ; la copie est enregistrée après chaque page (reprise possible).
+export async function syncStore(api: string | undefined, headers: HeadersInit, kinds: SyncKind[]): Promise<SyncStore> {
+  let store = loadStore(kinds)
+  while (true) {
+    const params = new URLSearchParams({ type: kinds.join(",") })
+    if (store.cursor) params.set("since", store.cursor)
+    const res = await fetch(`${api}/api/sync/?${params}`, { headers })
+    if (res.status === 400 && store.cursor) {
+      // Curseur illisible (copie d'une autre version) : on repart de zéro
+      store = emptyStore(kinds)
+      continue
+    }
+    if (!res.ok) throw new Error(`Erreur synchronisation: ${res.status}`)
+    const data = await res.json()
+    if (data.full) store = emptyStore(kinds)
+    for (const kind of kinds) {
+      const items = store.items[kind] || (store.items[kind] = {})
+      // Changements puis suppressions : un objet modifié puis supprimé disparaît
+      for (const item of data.changed[kind] || []) items[item.id] = item
+      for (const id of data.deleted[kind] || []) delete items[id]
+    }
+    store.cursor = data.cursor
+    saveStore(kinds, store)
+    if (!data.has_more) return store
+  }
+}